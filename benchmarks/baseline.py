@@ -0,0 +1,95 @@
+import os
+import json
+
+def result(value, unit="", higher_is_better=False):
+    """
+    Build a single benchmark result.
+
+    Args:
+        value: The measured value
+        unit: Unit shown in reports
+        higher_is_better: Whether an increase is an improvement
+    """
+    return {"value": value, "unit": unit, "higher_is_better": higher_is_better}
+
+def percentile(values, q):
+    """
+    Get a percentile of a list of numbers by linear interpolation.
+
+    Args:
+        values: The samples
+        q: The percentile, from 0 to 100
+
+    Returns:
+        The percentile, or 0.0 when there are no samples
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+def load(path):
+    """Load saved results from a JSON file."""
+    with open(path) as f:
+        return json.load(f)
+
+def save(path, results):
+    """Save results to a JSON file so later runs can compare against them."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+
+def compare(current, baseline, threshold):
+    """
+    Find results that got worse than the baseline by more than a threshold.
+
+    Args:
+        current: Results from this run
+        baseline: Previously saved results
+        threshold: Allowed relative change, e.g. 0.2 for 20%
+
+    Returns:
+        A list of (name, baseline value, current value, relative change) tuples
+    """
+    regressions = []
+    for name, entry in current.items():
+        base = baseline.get(name)
+        if base is None or not base["value"]:
+            continue
+
+        change = (entry["value"] - base["value"]) / abs(base["value"])
+        if entry.get("higher_is_better"):
+            change = -change
+        if change > threshold:
+            regressions.append((name, base["value"], entry["value"], change))
+    return regressions
+
+def check(current, baseline, threshold):
+    """
+    Print every regression against a baseline.
+
+    Returns:
+        True if anything regressed by more than the threshold
+    """
+    regressions = compare(current, baseline, threshold)
+    for name, old, new, change in regressions:
+        print(f"REGRESSION {name}: {old:.4f} -> {new:.4f} ({change:+.1%})")
+    return bool(regressions)
+
+def format_report(results, baseline=None):
+    """Format results as an aligned text table, with the change against a baseline if given."""
+    width = max((len(name) for name in results), default=0)
+    lines = []
+    for name, entry in sorted(results.items()):
+        line = f"{name:<{width}}  {entry['value']:>14.4f} {entry['unit']}"
+        base = (baseline or {}).get(name)
+        if base and base["value"]:
+            change = (entry["value"] - base["value"]) / abs(base["value"])
+            line += f"  ({change:+.1%} vs baseline)"
+        lines.append(line)
+    return "\n".join(lines)
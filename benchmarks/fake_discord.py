@@ -0,0 +1,169 @@
+"""
+Minimal stand-ins for the Discord objects the Music cog touches.
+
+They replace the gateway for load tests: joining a voice channel feeds
+the player the same voice state and voice server updates Discord would
+send, and messages are kept in memory instead of going over REST.
+"""
+import asyncio
+import itertools
+
+_ids = itertools.count(100000000000000000)
+
+def next_id():
+    return next(_ids)
+
+class FakeUser:
+    def __init__(self, name, *, bot=False):
+        self.id = next_id()
+        self.name = name
+        self.display_name = name
+        self.mention = f"<@{self.id}>"
+        self.bot = bot
+        self.avatar = None
+        self.guild = None
+        self.voice = None
+
+    def __eq__(self, other):
+        return isinstance(other, FakeUser) and other.id == self.id
+
+    def __hash__(self):
+        return hash(self.id)
+
+class FakeVoiceState:
+    def __init__(self, channel):
+        self.channel = channel
+
+class FakeMessage:
+    def __init__(self, channel, kwargs):
+        self.id = next_id()
+        self.channel = channel
+        self.kwargs = kwargs
+
+    async def edit(self, **kwargs):
+        await self.channel.request()
+        self.channel.edited += 1
+        self.kwargs.update(kwargs)
+        return self
+
+    async def delete(self):
+        await self.channel.request()
+
+class FakeTextChannel:
+    def __init__(self, guild, *, latency=0.0):
+        self.id = next_id()
+        self.name = "music"
+        self.guild = guild
+        self.mention = f"<#{self.id}>"
+        self.latency = latency
+        self.sent = 0
+        self.edited = 0
+
+    async def request(self):
+        """Stand in for the round trip of a Discord REST call."""
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    async def send(self, content=None, **kwargs):
+        await self.request()
+        self.sent += 1
+        return FakeMessage(self, dict(kwargs, content=content))
+
+class FakeVoiceChannel:
+    def __init__(self, guild):
+        self.id = next_id()
+        self.name = "Music"
+        self.guild = guild
+        self.members = []
+
+    def _get_voice_client_key(self):
+        # Read by discord.py's VoiceProtocol.cleanup when a player is destroyed
+        return self.guild.id, "guild_id"
+
+    async def connect(self, *, cls, timeout=60.0, reconnect=True, self_deaf=False, self_mute=False):
+        client = self.guild.client
+        player = cls(client, self)
+        client._connection._add_voice_client(self.guild.id, player)
+        self.guild.voice_client = player
+        await player.connect(timeout=timeout, reconnect=reconnect, self_deaf=self_deaf, self_mute=self_mute)
+        return player
+
+class FakeGuild:
+    """
+    A guild with one text channel, one voice channel and one listener.
+
+    Args:
+        client: The bot under test
+        index: Used to name the guild
+        latency: Simulated Discord REST latency in seconds
+    """
+    def __init__(self, client, index, *, latency=0.0):
+        self.id = next_id()
+        self.name = f"Guild {index}"
+        self.client = client
+        self.voice_client = None
+        self.text_channel = FakeTextChannel(self, latency=latency)
+        self.voice_channel = FakeVoiceChannel(self)
+        self.channels = {channel.id: channel for channel in (self.text_channel, self.voice_channel)}
+
+        self.me = FakeUser(client.user.name, bot=True)
+        self.me.id = client.user.id
+        self.me.guild = self
+        self.member = FakeUser(f"listener-{index}")
+        self.member.guild = self
+        self.member.voice = FakeVoiceState(self.voice_channel)
+        self.voice_channel.members.append(self.member)
+
+    def get_channel(self, channel_id):
+        return self.channels.get(channel_id)
+
+    def get_member(self, user_id):
+        return next((member for member in (self.me, self.member) if member.id == user_id), None)
+
+    async def change_voice_state(self, *, channel, self_mute=False, self_deaf=False):
+        """Answer a voice state change the way the gateway would."""
+        player = self.voice_client
+        if channel is None:
+            self.me.voice = None
+            self.voice_client = None
+            return
+
+        self.me.voice = FakeVoiceState(channel)
+        if player is None:
+            return
+
+        session = f"session-{self.id}"
+        await player.on_voice_state_update({
+            "guild_id": str(self.id),
+            "channel_id": str(channel.id),
+            "user_id": str(self.me.id),
+            "session_id": session,
+            "self_deaf": self_deaf,
+            "self_mute": self_mute,
+        })
+        await player.on_voice_server_update({
+            "guild_id": str(self.id),
+            "token": f"token-{self.id}",
+            "endpoint": "fake.discord.media:443",
+        })
+
+class FakeContext:
+    """The parts of commands.Context the Music cog uses."""
+
+    def __init__(self, bot, guild, command):
+        self.bot = bot
+        self.guild = guild
+        self.author = guild.member
+        self.channel = guild.text_channel
+        self.command = command
+        self.message = FakeMessage(guild.text_channel, {})
+        self.interaction = None
+
+    async def defer(self, **kwargs):
+        pass
+
+    async def send(self, content=None, **kwargs):
+        return await self.channel.send(content, **kwargs)
+
+    async def reply(self, content=None, **kwargs):
+        return await self.channel.send(content, **kwargs)
@@ -0,0 +1,301 @@
+"""
+Stand-in Lavalink v4 node for offline load tests.
+
+Serves loadtracks with generated tracks, accepts player updates and
+"plays" each track for a fixed, short time before sending a
+TrackEndEvent over the websocket. It also answers the metadata filter
+API at /filter so nothing leaves the machine.
+
+Every play that follows a finished track is recorded with the guild,
+the finished track, the new track and how long the bot took to send
+it. The load test keeps only the ones the bot reports as advancing its
+queue.
+
+    python -m benchmarks.fake_lavalink --port 2333
+"""
+import time
+import uuid
+import asyncio
+import argparse
+import logging
+from aiohttp import web, WSMsgType
+
+from core import codec
+
+logger = logging.getLogger(__name__)
+
+def make_track(identifier, title, author="Fake Artist", length=180000):
+    """Build a track object in Lavalink v4's JSON shape."""
+    info = {
+        "identifier": identifier,
+        "isSeekable": True,
+        "author": author,
+        "length": length,
+        "isStream": False,
+        "position": 0,
+        "title": title,
+        "uri": f"https://www.youtube.com/watch?v={identifier}",
+        "artworkUrl": None,
+        "isrc": None,
+        "sourceName": "youtube",
+    }
+    return {"encoded": codec.encode(info), "info": info, "pluginInfo": {}, "userData": {}}
+
+class FakeLavalink:
+    def __init__(self, *, password="youshallnotpass", track_seconds=2.0, playlist_size=200, rest_delay=0.0):
+        self.password = password
+        self.track_seconds = track_seconds
+        self.playlist_size = playlist_size
+        self.rest_delay = rest_delay
+        self.sessions = {}
+        self.sockets = set()
+        self.players = {}
+        self.ended = {}
+        self.transitions = []
+        self.requests = 0
+        self.filters = 0
+        self.started = time.time()
+
+    def app(self):
+        app = web.Application()
+        app.router.add_get("/version", self.version)
+        app.router.add_get("/v4/websocket", self.websocket)
+        app.router.add_get("/v4/info", self.info)
+        app.router.add_get("/v4/stats", self.stats_handler)
+        app.router.add_get("/v4/loadtracks", self.loadtracks)
+        app.router.add_patch("/v4/sessions/{session}", self.update_session)
+        app.router.add_get("/v4/sessions/{session}/players", self.get_players)
+        app.router.add_get("/v4/sessions/{session}/players/{guild}", self.get_player)
+        app.router.add_patch("/v4/sessions/{session}/players/{guild}", self.update_player)
+        app.router.add_delete("/v4/sessions/{session}/players/{guild}", self.destroy_player)
+        app.router.add_get("/filter", self.filter_title)
+        app.router.add_get("/harness/stats", self.harness_stats)
+        app.router.add_post("/harness/reset", self.harness_reset)
+        app.on_shutdown.append(self.close_sockets)
+        return app
+
+    async def close_sockets(self, app):
+        for ws in list(self.sockets):
+            await ws.close()
+
+    async def version(self, request):
+        return web.Response(text="4.0.0")
+
+    async def info(self, request):
+        return web.json_response({
+            "version": {"semver": "4.0.0", "major": 4, "minor": 0, "patch": 0, "preRelease": None},
+            "buildTime": 0, "git": {"branch": "fake", "commit": "fake", "commitTime": 0},
+            "jvm": "fake", "lavaplayer": "fake", "sourceManagers": ["youtube"], "filters": [], "plugins": [],
+        })
+
+    def _stats(self):
+        playing = sum(1 for player in self.players.values() if player["track"])
+        return {
+            "players": len(self.players),
+            "playingPlayers": playing,
+            "uptime": int((time.time() - self.started) * 1000),
+            "memory": {"free": 0, "used": 0, "allocated": 0, "reservable": 0},
+            "cpu": {"cores": 1, "systemLoad": 0.0, "lavalinkLoad": 0.0},
+            "frameStats": {"sent": 0, "nulled": 0, "deficit": 0},
+        }
+
+    async def stats_handler(self, request):
+        return web.json_response(self._stats())
+
+    async def websocket(self, request):
+        if request.headers.get("Authorization") != self.password:
+            return web.Response(status=401)
+
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+
+        session_id = request.headers.get("Session-Id") or uuid.uuid4().hex[:16]
+        resumed = session_id in self.sessions
+        self.sessions[session_id] = ws
+        self.sockets.add(ws)
+        await ws.send_json({"op": "ready", "resumed": resumed, "sessionId": session_id})
+
+        async def send_stats():
+            while not ws.closed:
+                await ws.send_json({"op": "stats", **self._stats()})
+                await asyncio.sleep(5)
+
+        stats_task = asyncio.create_task(send_stats())
+        try:
+            async for message in ws:
+                if message.type in (WSMsgType.ERROR, WSMsgType.CLOSE):
+                    break
+        finally:
+            stats_task.cancel()
+            self.sockets.discard(ws)
+            if self.sessions.get(session_id) is ws:
+                self.sessions[session_id] = None
+        return ws
+
+    async def loadtracks(self, request):
+        self.requests += 1
+        if self.rest_delay:
+            await asyncio.sleep(self.rest_delay)
+
+        identifier = request.query.get("identifier", "")
+        if "list=" in identifier:
+            name = identifier.rsplit("list=", 1)[-1]
+            tracks = [make_track(f"{name}-{i}", f"{name} track {i}") for i in range(self.playlist_size)]
+            return web.json_response({
+                "loadType": "playlist",
+                "data": {"info": {"name": f"Playlist {name}", "selectedTrack": -1}, "pluginInfo": {}, "tracks": tracks},
+            })
+
+        term = identifier.partition(":")[2] or identifier
+        key = uuid.uuid5(uuid.NAMESPACE_URL, term).hex[:11]
+        tracks = [make_track(f"{key}{i}", f"{term} ({i})") for i in range(5)]
+        return web.json_response({"loadType": "search", "data": tracks})
+
+    def _unknown_session(self, request):
+        if request.match_info["session"] in self.sessions:
+            return None
+        return web.json_response({"error": "Not Found", "message": "Session not found"}, status=404)
+
+    async def update_session(self, request):
+        unknown = self._unknown_session(request)
+        if unknown is not None:
+            return unknown
+        data = await request.json()
+        return web.json_response({"resuming": data.get("resuming", False), "timeout": data.get("timeout", 60)})
+
+    def _player_json(self, guild_id):
+        player = self.players.get(guild_id, {})
+        return {
+            "guildId": guild_id,
+            "track": player.get("track"),
+            "volume": player.get("volume", 100),
+            "paused": player.get("paused", False),
+            "state": {"time": int(time.time() * 1000), "position": 0, "connected": True, "ping": 0},
+            "voice": player.get("voice", {}),
+            "filters": {},
+        }
+
+    async def get_players(self, request):
+        unknown = self._unknown_session(request)
+        if unknown is not None:
+            return unknown
+        return web.json_response([self._player_json(guild_id) for guild_id in self.players])
+
+    async def get_player(self, request):
+        return web.json_response(self._player_json(request.match_info["guild"]))
+
+    async def _send(self, session_id, payload):
+        ws = self.sessions.get(session_id)
+        if ws is not None and not ws.closed:
+            await ws.send_json(payload)
+
+    async def _end_track(self, session_id, guild_id, track, reason):
+        if reason == "finished":
+            self.ended[guild_id] = (time.perf_counter(), track["encoded"])
+        await self._send(session_id, {
+            "op": "event", "type": "TrackEndEvent", "guildId": guild_id, "track": track, "reason": reason,
+        })
+
+    async def _play(self, session_id, guild_id, track):
+        await self._send(session_id, {"op": "event", "type": "TrackStartEvent", "guildId": guild_id, "track": track})
+        await self._send(session_id, {
+            "op": "playerUpdate", "guildId": guild_id,
+            "state": {"time": int(time.time() * 1000), "position": 0, "connected": True, "ping": 0},
+        })
+        await asyncio.sleep(self.track_seconds)
+
+        player = self.players.get(guild_id)
+        if player and player["track"] is track:
+            player["track"] = None
+            await self._end_track(session_id, guild_id, track, "finished")
+
+    async def update_player(self, request):
+        session_id = request.match_info["session"]
+        guild_id = request.match_info["guild"]
+        data = await request.json() if request.can_read_body else {}
+        player = self.players.setdefault(guild_id, {"track": None, "task": None, "volume": 100, "paused": False})
+
+        for key in ("volume", "paused", "voice"):
+            if key in data:
+                player[key] = data[key]
+
+        if "encodedTrack" in data or "track" in data:
+            encoded = data.get("encodedTrack")
+            if encoded is None and isinstance(data.get("track"), dict):
+                encoded = data["track"].get("encoded")
+            previous = player["track"]
+            if player["task"]:
+                player["task"].cancel()
+                player["task"] = None
+
+            if encoded is None:
+                player["track"] = None
+                if previous:
+                    await self._end_track(session_id, guild_id, previous, "stopped")
+            else:
+                ended = self.ended.pop(guild_id, None)
+                if ended is not None:
+                    ended_at, ended_track = ended
+                    self.transitions.append({
+                        "guild": guild_id, "ended": ended_track, "track": encoded,
+                        "latency": time.perf_counter() - ended_at,
+                    })
+                if previous:
+                    await self._end_track(session_id, guild_id, previous, "replaced")
+
+                try:
+                    info = codec.decode(encoded)
+                except codec.TrackDecodeError:
+                    return web.json_response({"error": "Bad Request", "message": "Invalid encoded track"}, status=400)
+                track = {"encoded": encoded, "info": info, "pluginInfo": {}, "userData": {}}
+                player["track"] = track
+                player["task"] = asyncio.create_task(self._play(session_id, guild_id, track))
+
+        return web.json_response(self._player_json(guild_id))
+
+    async def destroy_player(self, request):
+        player = self.players.pop(request.match_info["guild"], None)
+        if player and player["task"]:
+            player["task"].cancel()
+        return web.Response(status=204)
+
+    async def filter_title(self, request):
+        self.filters += 1
+        title = request.query.get("track", "")
+        return web.json_response({"status": "success", "data": {"track": title.split(" (")[0]}})
+
+    async def harness_stats(self, request):
+        return web.json_response({
+            "transitions": self.transitions,
+            "loadtracks": self.requests,
+            "filters": self.filters,
+            "players": len(self.players),
+        })
+
+    async def harness_reset(self, request):
+        self.transitions.clear()
+        self.ended.clear()
+        self.requests = 0
+        self.filters = 0
+        return web.json_response({})
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=2333)
+    parser.add_argument("--password", default="youshallnotpass")
+    parser.add_argument("--track-seconds", type=float, default=2.0)
+    parser.add_argument("--playlist-size", type=int, default=200)
+    parser.add_argument("--rest-delay", type=float, default=0.0, help="Artificial loadtracks latency in seconds")
+    args = parser.parse_args()
+
+    node = FakeLavalink(
+        password=args.password,
+        track_seconds=args.track_seconds,
+        playlist_size=args.playlist_size,
+        rest_delay=args.rest_delay
+    )
+    web.run_app(node.app(), host=args.host, port=args.port, print=None, shutdown_timeout=1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+"""
+End-to-end load test for the music bot, fully offline.
+
+Starts a fake Lavalink node in a subprocess, builds a real MusicBot
+with the Music cog loaded, and drives N simulated guilds through the
+cog's commands while the fake node plays short tracks and sends track
+end events back over the websocket.
+
+Reports commands/s, command latency, track transition latency (track
+end to the next play request, measured by the fake node), memory per
+player and event loop lag. The first traceback of each exception a
+command raises is printed, and any command error fails the run.
+
+    python -m benchmarks.loadtest --guilds 100 --duration 60
+    python -m benchmarks.loadtest --save benchmarks/results/loadtest.json
+    python -m benchmarks.loadtest --baseline benchmarks/results/loadtest.json --threshold 0.25
+"""
+import os
+import sys
+import time
+import json
+import random
+import socket
+import asyncio
+import argparse
+import traceback
+from collections import defaultdict
+
+# Keep the bot quiet and local before config is imported
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ["METRICS_PORT"] = "0"
+# setup_hook never runs here, so leave the track store closed and out of data/
+os.environ["TRACK_STORE_PATH"] = ""
+
+import aiohttp
+from discord.utils import maybe_coroutine
+
+from benchmarks import baseline
+from benchmarks.fake_discord import FakeContext, FakeGuild, FakeUser
+from utils.metrics import LOOKAHEAD_TRACKS
+
+COMMAND_WEIGHTS = {
+    "play": 4,
+    "queue": 3,
+    "nowplaying": 3,
+    "volume": 1,
+    "shuffle": 1,
+    "skip": 2,
+    "pause": 1,
+    "resume": 1,
+}
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+class LagSampler:
+    """Records how late each event loop wake-up is."""
+
+    def __init__(self, interval=0.05):
+        self.interval = interval
+        self.samples = []
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+
+    async def _run(self):
+        while True:
+            expected = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, time.perf_counter() - expected))
+
+class LoadTest:
+    def __init__(self, args):
+        self.args = args
+        self.port = args.port or free_port()
+        self.rest = f"http://127.0.0.1:{self.port}"
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.commands = 0
+        self.advances = set()
+        self.process = None
+        self.bot = None
+        self.cog = None
+
+    async def start_node(self):
+        """Start the fake Lavalink node and wait until it answers."""
+        self.process = await asyncio.create_subprocess_exec(
+            sys.executable, "-m", "benchmarks.fake_lavalink",
+            "--port", str(self.port),
+            "--track-seconds", str(self.args.track_seconds),
+            "--playlist-size", str(self.args.playlist_size),
+            "--rest-delay", str(self.args.rest_delay),
+        )
+        async with aiohttp.ClientSession() as session:
+            for _ in range(100):
+                try:
+                    async with session.get(f"{self.rest}/version") as response:
+                        if response.status == 200:
+                            return
+                except aiohttp.ClientError:
+                    pass
+                await asyncio.sleep(0.1)
+        raise RuntimeError("Fake Lavalink node did not start")
+
+    async def start_bot(self):
+        from core.bot import MusicBot
+        from core.metadata import MetadataFilter
+        from core.nodes import NodeManager
+
+        bot = self.bot = MusicBot(shard_count=1)
+        # There is no gateway session, so stand in for the logged-in user.
+        bot._connection.user = FakeUser("LoadTestBot", bot=True)
+        bot.node_manager = NodeManager(bot, nodes=[{
+            "host": "127.0.0.1",
+            "port": self.port,
+            "password": "youshallnotpass",
+            "identifier": "FAKE",
+        }], session_path="")
+        # Keep the load test's players out of the real snapshot journal.
+        bot.snapshots = None
+        bot.metadata_filter = MetadataFilter(url=f"{self.rest}/filter")
+        bot.add_listener(self.on_queue_advance, "on_queue_advance")
+
+        await bot.__aenter__()
+        await bot.load_extension("cogs.Music")
+        bot.timer_wheel.start()
+        bot.watchdog.start()
+        # pomice waits for the bot to be ready before connecting a node
+        bot._ready.set()
+        if not await bot.node_manager.connect():
+            raise RuntimeError("Could not connect to the fake Lavalink node")
+        self.cog = bot.get_cog("Music")
+
+    async def on_queue_advance(self, player, ended, track):
+        self.advances.add((str(player.guild.id), ended.track_id, track.track_id))
+
+    async def invoke(self, guild, name, **kwargs):
+        """Run a command's checks and callback the way the bot would, and time it."""
+        command = self.bot.get_command(name)
+        ctx = FakeContext(self.bot, guild, command)
+        started = time.perf_counter()
+        try:
+            for check in command.checks:
+                if not await maybe_coroutine(check, ctx):
+                    return
+            await command.callback(self.cog, ctx, **kwargs)
+        except Exception as e:
+            error = type(e).__name__
+            if not self.errors[error]:
+                print(f"{name} raised {error}:", file=sys.stderr)
+                traceback.print_exception(e)
+            self.errors[error] += 1
+            return
+        finally:
+            self.commands += 1
+        self.latencies[name].append(time.perf_counter() - started)
+
+    async def run_guild(self, guild, index, deadline):
+        rng = random.Random(index)
+        await self.invoke(guild, "play", query=f"song {index}")
+        if index % self.args.playlist_every == 0:
+            await self.invoke(guild, "play", query=f"https://www.youtube.com/playlist?list=PL{index}")
+
+        names = list(COMMAND_WEIGHTS)
+        weights = list(COMMAND_WEIGHTS.values())
+        while time.perf_counter() < deadline:
+            await asyncio.sleep(rng.expovariate(1 / self.args.think_time))
+            name = rng.choices(names, weights)[0]
+            if name == "play":
+                await self.invoke(guild, name, query=f"song {rng.randrange(self.args.catalog)}")
+            elif name == "volume":
+                await self.invoke(guild, name, volume=rng.randrange(101))
+            else:
+                await self.invoke(guild, name)
+
+    async def run(self):
+        from utils.helpers import get_memory_usage
+
+        await self.start_node()
+        try:
+            await self.start_bot()
+            guilds = [FakeGuild(self.bot, i, latency=self.args.discord_latency) for i in range(self.args.guilds)]
+
+            before = get_memory_usage()
+            await asyncio.gather(*(self.invoke(guild, "play", query=f"warmup {i}") for i, guild in enumerate(guilds)))
+            players = sum(1 for _ in self.bot.node_manager.players)
+            per_player = (get_memory_usage() - before) / max(players, 1)
+
+            async with aiohttp.ClientSession() as session:
+                await session.post(f"{self.rest}/harness/reset")
+
+            self.latencies.clear()
+            self.errors.clear()
+            self.commands = 0
+            sampler = LagSampler()
+            sampler.start()
+            started = time.perf_counter()
+            deadline = started + self.args.duration
+            await asyncio.gather(*(self.run_guild(guild, i, deadline) for i, guild in enumerate(guilds)))
+            elapsed = time.perf_counter() - started
+            sampler.stop()
+
+            async with aiohttp.ClientSession() as session:
+                async with session.get(f"{self.rest}/harness/stats") as response:
+                    node_stats = await response.json()
+
+            await asyncio.gather(*(self.invoke(guild, "disconnect") for guild in guilds))
+            return self.report(elapsed, per_player, players, sampler.samples, node_stats)
+        finally:
+            if self.bot is not None:
+                await self.bot.close()
+            if self.process.returncode is None:
+                self.process.terminate()
+                await self.process.wait()
+
+    def report(self, elapsed, per_player, players, lag, node_stats):
+        result = baseline.result
+        latencies = [value for values in self.latencies.values() for value in values]
+        # Only plays the bot made from its queue, not a /play after the queue ran out.
+        # Tracks repeat within a guild, so match on both the ended and the new track.
+        transitions = [
+            transition["latency"] for transition in node_stats["transitions"]
+            if (transition["guild"], transition["ended"], transition["track"]) in self.advances
+        ]
+        results = {
+            "commands_per_sec": result(self.commands / elapsed, "cmd/s", higher_is_better=True),
+            "command_latency_p50": result(baseline.percentile(latencies, 50) * 1000, "ms"),
+            "command_latency_p99": result(baseline.percentile(latencies, 99) * 1000, "ms"),
+            "transition_latency_p50": result(baseline.percentile(transitions, 50) * 1000, "ms"),
+            "transition_latency_p99": result(baseline.percentile(transitions, 99) * 1000, "ms"),
+            "memory_per_player": result(per_player / 1024, "KiB"),
+            "loop_lag_p99": result(baseline.percentile(lag, 99) * 1000, "ms"),
+            "loop_lag_max": result(max(lag, default=0.0) * 1000, "ms"),
+            "command_errors": result(sum(self.errors.values()), "errors"),
+        }
+        for name, values in sorted(self.latencies.items()):
+            results[f"command_latency_p99.{name}"] = result(baseline.percentile(values, 99) * 1000, "ms")
+
+        details = {
+            "players": players,
+            "transitions": len(transitions),
+            "loadtracks_requests": node_stats["loadtracks"],
+            "filter_requests": node_stats["filters"],
+            "lookahead": {result: LOOKAHEAD_TRACKS.get(result=result) for result in ("hit", "miss")},
+            "errors": dict(self.errors),
+            "loop_stalls": [(label, entry["count"], entry["total"]) for label, entry in self.bot.watchdog.top(5)],
+        }
+        return results, details
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--guilds", type=int, default=50, help="Number of simulated guilds")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds to drive commands for")
+    parser.add_argument("--think-time", type=float, default=1.0, help="Mean seconds between a guild's commands")
+    parser.add_argument("--catalog", type=int, default=500, help="Distinct search queries to draw from")
+    parser.add_argument("--playlist-every", type=int, default=5, help="Every Nth guild also queues a playlist")
+    parser.add_argument("--playlist-size", type=int, default=200)
+    parser.add_argument("--track-seconds", type=float, default=2.0, help="How long the fake node plays each track")
+    parser.add_argument("--rest-delay", type=float, default=0.0, help="Artificial Lavalink REST latency in seconds")
+    parser.add_argument("--discord-latency", type=float, default=0.0, help="Artificial Discord REST latency in seconds")
+    parser.add_argument("--port", type=int, default=0, help="Port for the fake node (default: any free port)")
+    parser.add_argument("--save", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="Compare against results saved with --save")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed regression against the baseline")
+    args = parser.parse_args()
+
+    results, details = asyncio.run(LoadTest(args).run())
+    saved = baseline.load(args.baseline) if args.baseline else None
+
+    print(baseline.format_report(results, saved))
+    print(json.dumps(details, indent=2))
+
+    if details["errors"]:
+        print(f"Commands raised errors: {details['errors']}, see the tracebacks above", file=sys.stderr)
+        sys.exit(1)
+
+    if args.save:
+        baseline.save(args.save, results)
+
+    if saved is not None and baseline.check(results, saved, args.threshold):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
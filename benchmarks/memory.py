@@ -0,0 +1,88 @@
+"""
+Memory cost of a queued track, as a full pomice Track versus a QueuedTrack.
+
+Tracks are built from a loadtracks-style JSON payload, the way they
+arrive from Lavalink, and only memory still held once the payload is
+gone is counted.
+
+    python -m benchmarks.memory --tracks 5000
+    python -m benchmarks.memory --baseline benchmarks/results/memory.json
+"""
+import gc
+import sys
+import json
+import argparse
+import tracemalloc
+
+from benchmarks import baseline
+from benchmarks.fake_discord import FakeUser
+from benchmarks.fake_lavalink import make_track
+from core.store import build_track
+from core.track import QueuedTrack
+
+def _payload(count):
+    tracks = [
+        make_track(f"{i:011d}", f"Artist {i % 50} - Song title number {i}", author=f"Artist {i % 50}")
+        for i in range(count)
+    ]
+    return json.dumps({"loadType": "playlist", "data": {"tracks": tracks}})
+
+def _load(payload, requester):
+    tracks = []
+    for data in json.loads(payload)["data"]["tracks"]:
+        track = build_track(data["encoded"], data["info"])
+        track.requester = requester
+        tracks.append(track)
+    return tracks
+
+def measure(count, compact):
+    """
+    Measure the bytes retained per queued track.
+
+    Args:
+        count: Number of tracks to queue
+        compact: Whether to keep QueuedTracks instead of pomice Tracks
+    """
+    payload = _payload(count)
+    requester = FakeUser("listener")
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+
+    queue = _load(payload, requester)
+    if compact:
+        queue = [QueuedTrack.from_track(track) for track in queue]
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0] - before
+
+    tracemalloc.stop()
+    del queue
+    return retained / count
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tracks", type=int, default=5000)
+    parser.add_argument("--save", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="Compare against results saved with --save")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Allowed regression against the baseline")
+    args = parser.parse_args()
+
+    full = measure(args.tracks, compact=False)
+    compact = measure(args.tracks, compact=True)
+    results = {
+        "queued_track_bytes[pomice]": baseline.result(full, "bytes/track"),
+        "queued_track_bytes[compact]": baseline.result(compact, "bytes/track"),
+    }
+
+    saved = baseline.load(args.baseline) if args.baseline else None
+    print(baseline.format_report(results, saved))
+    print(f"QueuedTrack uses {compact / full:.0%} of the memory of a pomice Track")
+
+    if args.save:
+        baseline.save(args.save, results)
+
+    if saved is not None and baseline.check(results, saved, args.threshold):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
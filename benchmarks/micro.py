@@ -0,0 +1,196 @@
+"""
+Micro-benchmarks for the queue, embed, helper, codec and snapshot hot paths.
+
+Each benchmark reports the best per-call time over several repeats.
+Results can be saved as a baseline and later runs compared against it.
+
+    python -m benchmarks.micro
+    python -m benchmarks.micro --save benchmarks/results/micro.json
+    python -m benchmarks.micro --baseline benchmarks/results/micro.json --threshold 0.1
+    python -m benchmarks.micro --filter queue.index
+"""
+import os
+import sys
+import random
+import atexit
+import tempfile
+import timeit
+import argparse
+
+from benchmarks import baseline
+from benchmarks.fake_discord import FakeUser
+from core import codec
+from core.queue import TrackQueue
+from core.snapshots import SnapshotJournal, _dumps
+from utils.embeds import now_playing_embed, queue_embed
+from utils.helpers import format_time, is_url
+
+QUEUE_SIZES = (10, 1000, 100000)
+
+class BenchTrack:
+    """The track attributes the queue and embeds read."""
+    __slots__ = ("title", "uri", "info", "requester")
+
+    def __init__(self, index):
+        self.title = f"Artist {index % 97} - Song title number {index}"
+        self.uri = f"https://www.youtube.com/watch?v={index:011d}"
+        self.info = {"length": 215000, "author": f"Artist {index % 97}", "sourceName": "youtube"}
+        self.requester = None
+
+class BenchPlayer:
+    """Holds a queue the way MusicPlayer does, for the embed builders."""
+
+    def __init__(self, queue):
+        self.queue = queue
+
+def _queue(size):
+    return TrackQueue(BenchTrack(i) for i in range(size))
+
+def queue_benchmarks(size):
+    """Build the queue benchmarks for a queue of the given size."""
+    rotating, shuffled, lookup = _queue(size), _queue(size), _queue(size)
+    missing = BenchTrack(-1)
+    last = lookup[-1]
+    middle = size // 2
+
+    def put_get():
+        rotating.put_nowait(rotating.get_nowait())
+
+    def shuffle():
+        shuffled.shuffle()
+
+    def index_last():
+        lookup.index(last)
+
+    def index_missing():
+        lookup.index(missing)
+
+    def as_list():
+        list(lookup)
+
+    def page():
+        lookup.page(middle, 10)
+
+    return {
+        f"queue.put_get[{size}]": put_get,
+        f"queue.shuffle[{size}]": shuffle,
+        f"queue.index_last[{size}]": index_last,
+        f"queue.index_missing[{size}]": index_missing,
+        f"queue.list[{size}]": as_list,
+        f"queue.page[{size}]": page,
+    }
+
+def embed_benchmarks():
+    player = BenchPlayer(_queue(1000))
+    current = BenchTrack(0)
+    requester = FakeUser("listener")
+    middle_page = len(player.queue) // 20
+
+    return {
+        "embed.queue[first]": lambda: queue_embed(player, current, page=1),
+        "embed.queue[middle]": lambda: queue_embed(player, current, page=middle_page),
+        "embed.now_playing": lambda: now_playing_embed(current, requester),
+        "embed.now_playing[progress]": lambda: now_playing_embed(current, requester, position=93000),
+    }
+
+def helper_benchmarks():
+    return {
+        "helpers.is_url[url]": lambda: is_url("https://www.youtube.com/watch?v=dQw4w9WgXcQ"),
+        "helpers.is_url[search]": lambda: is_url("never gonna give you up"),
+        "helpers.format_time": lambda: format_time(5025),
+    }
+
+def codec_benchmarks():
+    info = {
+        "identifier": "dQw4w9WgXcQ", "isSeekable": True, "author": "RickAstleyVEVO", "length": 212000,
+        "isStream": False, "position": 0, "title": "Rick Astley - Never Gonna Give You Up",
+        "uri": "https://www.youtube.com/watch?v=dQw4w9WgXcQ", "artworkUrl": None, "isrc": None,
+        "sourceName": "youtube",
+    }
+    encoded = codec.encode(info)
+    batch = [codec.encode(dict(info, identifier=f"{i:011d}")) for i in range(1000)]
+
+    return {
+        "codec.decode": lambda: codec.decode(encoded),
+        "codec.encode": lambda: codec.encode(info),
+        "codec.decode_many[1000]": lambda: codec.decode_many(batch),
+    }
+
+def snapshot_benchmarks(players=100, queued=50):
+    """Serializing and appending a snapshot batch, and loading the journal on restart."""
+    entry = [codec.encode({
+        "identifier": "dQw4w9WgXcQ", "author": "RickAstleyVEVO", "length": 212000, "isStream": False,
+        "title": "Rick Astley - Never Gonna Give You Up", "sourceName": "youtube",
+    }), "Rick Astley - Never Gonna Give You Up", "youtube", 1234]
+    records = [
+        {
+            "guild": guild, "voice_channel": guild, "bound_channel": guild, "volume": 100, "loop": False,
+            "paused": False, "position": 93000, "current": entry, "queue": [entry] * queued, "time": 0.0,
+        }
+        for guild in range(players)
+    ]
+
+    directory = tempfile.TemporaryDirectory()
+    atexit.register(directory.cleanup)
+    journal = SnapshotJournal(os.path.join(directory.name, "append.jsonl"))
+    loaded = SnapshotJournal(os.path.join(directory.name, "load.jsonl"))
+    loaded.compact(records)
+    atexit.register(journal.close)
+
+    return {
+        f"snapshot.serialize[{players}]": lambda: b"".join(_dumps(record) for record in records),
+        "snapshot.append[1]": lambda: journal.append(records[:1]),
+        f"snapshot.load[{players}]": loaded.load,
+    }
+
+def all_benchmarks():
+    benchmarks = {}
+    for size in QUEUE_SIZES:
+        benchmarks.update(queue_benchmarks(size))
+    benchmarks.update(embed_benchmarks())
+    benchmarks.update(helper_benchmarks())
+    benchmarks.update(codec_benchmarks())
+    benchmarks.update(snapshot_benchmarks())
+    return benchmarks
+
+def measure(function, repeat):
+    """
+    Time a function.
+
+    Args:
+        function: Called with no arguments
+        repeat: Number of timing runs to take the best of
+
+    Returns:
+        The best time per call in seconds
+    """
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filter", default="", help="Only run benchmarks whose name contains this")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--save", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="Compare against results saved with --save")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Allowed regression against the baseline")
+    args = parser.parse_args()
+
+    random.seed(0)
+    results = {}
+    for name, function in all_benchmarks().items():
+        if args.filter in name:
+            results[name] = baseline.result(measure(function, args.repeat) * 1e6, "us/op")
+
+    saved = baseline.load(args.baseline) if args.baseline else None
+    print(baseline.format_report(results, saved))
+
+    if args.save:
+        baseline.save(args.save, results)
+
+    if saved is not None and baseline.check(results, saved, args.threshold):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,4 @@
+from core.cluster import launch
+
+if __name__ == "__main__":
+    launch()
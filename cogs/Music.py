@@ -1,16 +1,16 @@
 import discord
-import pomice
 import logging
-import random
 import asyncio
 from discord.ext import commands
 from discord import app_commands
 
 from core.player import MusicPlayer
+from core.loader import PlaylistLoader
 from utils.embeds import (
     success_embed, error_embed, music_embed, 
-    queue_embed, now_playing_embed
+    now_playing_embed
 )
+from utils.views import QueueView
 from utils.helpers import is_url, format_time
 import aiohttp
 
@@ -22,7 +22,7 @@ def ensure_voice(check_playing=False):
             return False
             
         if check_playing:
-            player = ctx.bot.node.get_player(ctx.guild.id)
+            player = ctx.bot.node_manager.get_player(ctx.guild.id)
             if not player or not player.is_playing and not player.is_paused:
                 await ctx.send(embed=error_embed("Nothing is currently playing."))
                 return False
@@ -33,32 +33,25 @@ def ensure_voice(check_playing=False):
 class Music(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.pomice = pomice.NodePool()
-        self.looping = {}
-        self.node_ready = False
-        self.player_guilds = {}
 
     @commands.Cog.listener()
     async def on_ready(self):
-        if not self.node_ready:
+        if not self.bot.node_manager.ready:
             await self.start_nodes()
 
     async def start_nodes(self):
-        try:
-            self.bot.node = await self.pomice.create_node(
-                bot=self.bot,
-                host="lava-v4.ajieblogs.eu.org",
-                port=80,
-                password="https://dsc.gg/ajidevserver",
-                identifier="MAIN",
-            )
-            self.node_ready = True
-            logger.info("Lavalink node is ready!")
-        except Exception as error:
-            logger.error(f"Failed to initialize Lavalink node: {error}")
+        if await self.bot.node_manager.connect():
+            logger.info(f"Connected to {len(self.bot.node_manager.nodes)} Lavalink node(s)")
+            if self.bot.snapshots:
+                await self.bot.snapshots.restore()
+            released = await self.bot.node_manager.release_resumable()
+            if released:
+                logger.info(f"Destroyed {released} resumed player(s) with no saved state")
+        else:
+            logger.error("Failed to initialize any Lavalink node")
 
     async def get_player(self, ctx, *, connect=True):
-        if not hasattr(self.bot, "node") or self.bot.node is None:
+        if not self.bot.node_manager.ready:
             raise commands.CommandError("Music system is not ready. Please try again later.")
         
         if not ctx.author.voice:
@@ -67,22 +60,18 @@ class Music(commands.Cog):
         if ctx.guild.me.voice and ctx.guild.me.voice.channel != ctx.author.voice.channel:
             raise commands.CommandError("I'm already connected to another voice channel.")
         
-        player = self.bot.node.get_player(ctx.guild.id)
+        player = self.bot.node_manager.get_player(ctx.guild.id)
         
         if player is None or not ctx.guild.me.voice:
             if not connect:
                 raise commands.CommandError("I'm not connected to a voice channel.")
             else:
                 await ctx.author.voice.channel.connect(cls=MusicPlayer, self_deaf=True)
-                player = self.bot.node.get_player(ctx.guild.id)
+                player = self.bot.node_manager.get_player(ctx.guild.id)
                 
                 player.bound_channel = ctx.channel
                 await player.set_volume(self.bot.config.DEFAULT_VOLUME)
                 player.voice_channel = ctx.author.voice.channel.id
-                player.guild_id = ctx.guild.id 
-                
-                self.player_guilds[player] = ctx.guild.id
-                self.looping[ctx.guild.id] = False
         
         return player
 
@@ -98,7 +87,7 @@ class Music(commands.Cog):
         
         if not query:
             if player.is_paused:
-                await player.resume()
+                await player.set_pause(False)
                 return await ctx.send(embed=success_embed("Resumed playback"))
             return await ctx.send(embed=error_embed("Please provide a song name or URL"))
             
@@ -106,7 +95,7 @@ class Music(commands.Cog):
             if not is_url(query):
                 query = f"ytsearch:{query}"
                 
-            results = await player.get_tracks(query)
+            results = await self.bot.track_resolver.resolve(player, query)
             
             if not results:
                 return await ctx.send(embed=error_embed(f"No results found for: {query}"))
@@ -114,34 +103,57 @@ class Music(commands.Cog):
                 tracks = results.tracks
                 playlist_name = getattr(results, 'name', 'Playlist')
                 
-                for track in tracks:
-                    track.requester = ctx.author
-                    await player.queue.put(track)
+                first = tracks[0]
+                first.requester = ctx.author
+                await player.insert(first)
+                
+                if len(tracks) > 1:
+                    message = await ctx.send(embed=success_embed(
+                        f"Adding {len(tracks)} tracks from playlist: **{playlist_name}**"
+                    ))
                     
-                await ctx.send(embed=success_embed(f"Added {len(tracks)} tracks from playlist: **{playlist_name}**"))
+                    async def report(loader, finished):
+                        if finished:
+                            text = f"Added {loader.total + 1} tracks from playlist: **{playlist_name}**"
+                        else:
+                            text = f"Adding tracks from playlist: **{playlist_name}** ({loader.loaded + 1}/{loader.total + 1})"
+                        # Each update supersedes one still waiting on the rate limit
+                        self.bot.messages.edit(message, embed=success_embed(text), replace=f"playlist-{message.id}")
+                    
+                    player.cancel_loader()
+                    player.loader = PlaylistLoader(player, tracks[1:], requester=ctx.author, on_progress=report)
+                    player.loader.start()
+                else:
+                    await ctx.send(embed=success_embed(f"Added 1 track from playlist: **{playlist_name}**"))
             else:
                 track = results[0]
                 track.requester = ctx.author
-                await player.queue.put(track)
+                await player.insert(track)
                 await ctx.send(embed=music_embed(track, ctx.author))
                     
-            if not player.is_playing and not player.waiting:
-                await self.process_next_track(player, ctx.author)
+            await player.controller.start()
                 
         except Exception as e:
             logger.error(f"Error in play command: {e}")
             await ctx.send(embed=error_embed(f"An error occurred: {str(e)}"))
 
     @commands.hybrid_command(name="queue", description="Display the music queue")
+    @app_commands.describe(page="Page of the queue to show")
     @ensure_voice()
-    async def queue(self, ctx):
+    async def queue(self, ctx, page: int = 1):
         """Display the current music queue."""
         player = await self.get_player(ctx, connect=False)
         
         if player.queue.empty() and not player.is_playing:
             return await ctx.send(embed=error_embed("The queue is empty and nothing is playing."))
             
-        await ctx.send(embed=queue_embed(player, ctx.guild))
+        view = QueueView(player, ctx.author)
+        view.page = page
+        embed = view.render()
+        if view.total_pages == 1:
+            return await ctx.send(embed=embed)
+            
+        view.message = await ctx.send(embed=embed, view=view)
 
     @commands.hybrid_command(name="pause", description="Pause the current song")
     @ensure_voice()
@@ -155,7 +167,8 @@ class Music(commands.Cog):
         if player.is_paused:
             return await ctx.send(embed=error_embed("The player is already paused."))
             
-        await player.pause()
+        await player.set_pause(True)
+        player.panel.update()
         await ctx.send(embed=success_embed("Paused playback"))
 
     @commands.hybrid_command(name="resume", description="Resume the current song")
@@ -170,7 +183,8 @@ class Music(commands.Cog):
         if not player.is_paused:
             return await ctx.send(embed=error_embed("The player is not paused."))
             
-        await player.resume()
+        await player.set_pause(False)
+        player.panel.update()
         await ctx.send(embed=success_embed("Resumed playback"))
 
     @commands.hybrid_command(name="volume", description="Change the volume (0-100)")
@@ -198,7 +212,7 @@ class Music(commands.Cog):
         if not player.is_playing:
             return await ctx.send(embed=error_embed("Nothing is playing."))
             
-        await player.stop()
+        await player.controller.skip()
         await ctx.send(embed=success_embed("Skipped the current track"))
 
     @commands.hybrid_command(name="stop", description="Stop playback and clear the queue")
@@ -207,8 +221,7 @@ class Music(commands.Cog):
         """Stop playback and clear the queue."""
         player = await self.get_player(ctx, connect=False)
         
-        player.queue.clear()
-        await player.stop()
+        await player.controller.stop()
         await ctx.send(embed=success_embed("Stopped playback and cleared the queue"))
 
     @commands.hybrid_command(name="nowplaying", aliases=["np"], description="Show the currently playing song")
@@ -220,7 +233,8 @@ class Music(commands.Cog):
         if not player.is_playing:
             return await ctx.send(embed=error_embed("Nothing is playing."))
             
-        await ctx.send(embed=now_playing_embed(player.current, player.current.requester or ctx.author))
+        requester = getattr(player.current, "requester", None) or ctx.author
+        await ctx.send(embed=now_playing_embed(player.current, requester, position=player.position, paused=player.is_paused))
 
     @commands.hybrid_command(name="shuffle", description="Shuffle the music queue")
     @ensure_voice()
@@ -230,13 +244,39 @@ class Music(commands.Cog):
         
         if player.queue.empty():
             return await ctx.send(embed=error_embed("The queue is empty."))
-        queue_list = list(player.queue._queue)
-        random.shuffle(queue_list)
-        player.queue.clear()
-        for track in queue_list:
-            await player.queue.put(track)
+        player.queue.shuffle()
+        player.lookahead.schedule()
+            
+        await ctx.send(embed=success_embed(f"Shuffled **{len(player.queue)}** tracks in the queue"))
+
+    @commands.hybrid_command(name="remove", description="Remove a song from the queue")
+    @app_commands.describe(position="Position of the song in the queue")
+    @ensure_voice()
+    async def remove(self, ctx, position: int):
+        """Remove a song from the queue by its position."""
+        player = await self.get_player(ctx, connect=False)
+        
+        if not 1 <= position <= len(player.queue):
+            return await ctx.send(embed=error_embed(f"Position must be between 1 and {len(player.queue)}"))
             
-        await ctx.send(embed=success_embed(f"Shuffled **{len(queue_list)}** tracks in the queue"))
+        track = player.queue.remove(position - 1)
+        player.lookahead.schedule()
+        await ctx.send(embed=success_embed(f"Removed **{track.title}** from the queue"))
+
+    @commands.hybrid_command(name="move", description="Move a song to another position in the queue")
+    @app_commands.describe(source="Current position of the song", destination="New position of the song")
+    @ensure_voice()
+    async def move(self, ctx, source: int, destination: int):
+        """Move a song to another position in the queue."""
+        player = await self.get_player(ctx, connect=False)
+        
+        queue_length = len(player.queue)
+        if not 1 <= source <= queue_length or not 1 <= destination <= queue_length:
+            return await ctx.send(embed=error_embed(f"Positions must be between 1 and {queue_length}"))
+            
+        track = player.queue.move(source - 1, destination - 1)
+        player.lookahead.schedule()
+        await ctx.send(embed=success_embed(f"Moved **{track.title}** to position **{destination}**"))
 
     @commands.hybrid_command(name="loop", description="Toggle loop mode")
     @ensure_voice()
@@ -244,11 +284,8 @@ class Music(commands.Cog):
         """Toggle song looping on or off."""
         player = await self.get_player(ctx, connect=False)
         
-        if not ctx.guild.id in self.looping:
-            self.looping[ctx.guild.id] = False
-            
-        self.looping[ctx.guild.id] = not self.looping[ctx.guild.id]
-        status = "enabled" if self.looping[ctx.guild.id] else "disabled"
+        player.loop = not player.loop
+        status = "enabled" if player.loop else "disabled"
         
         await ctx.send(embed=success_embed(f"Loop mode is now **{status}**"))
     
@@ -259,8 +296,6 @@ class Music(commands.Cog):
         player = await self.get_player(ctx, connect=False)
         
         await player.teardown()
-        if player in self.player_guilds:
-            del self.player_guilds[player]
             
         await ctx.send(embed=success_embed("Disconnected from voice channel"))
 
@@ -283,82 +318,5 @@ class Music(commands.Cog):
         formatted_position = format_time(position_ms)
         await ctx.send(embed=success_embed(f"Seeked to **{formatted_position}**"))
 
-    async def process_next_track(self, player, user):
-        if player.is_playing or player.waiting:
-            return
-            
-        player.waiting = True
-        
-        try:
-            if player.queue.empty():
-                player.waiting = False
-                return
-                
-            track = await player.queue.get()
-            await player.play(track)
-            
-            if player.bound_channel:
-                embed = now_playing_embed(track, user)
-                await player.bound_channel.send(embed=embed)
-        except Exception as e:
-            logger.error(f"Error processing next track: {e}")
-            if player.bound_channel:
-                await player.bound_channel.send(embed=error_embed(f"An error occurred while playing the next track: {e}"))
-        finally:
-            player.waiting = False
-
-    @commands.Cog.listener()
-    async def on_pomice_track_end(self, player, track, reason):
-        guild_id = None
-        
-        if player in self.player_guilds:
-            guild_id = self.player_guilds[player]
-        elif hasattr(player, 'guild_id'):
-            guild_id = player.guild_id
-            
-        if guild_id is None:
-            logger.warning("Could not determine guild_id in on_pomice_track_end")
-            return
-           
-        if reason == "FINISHED":
-            if self.looping.get(guild_id, False):
-                await player.queue.put(track)
-            
-            user = None
-            ctx = None
-            if player.message:
-                ctx = await self.bot.get_context(player.message)
-                if ctx:
-                    user = ctx.author
-            
-            if not user and hasattr(player, 'bound_channel'):
-                user = self.bot.user
-                
-            await self.process_next_track(player, user or self.bot.user)
-
-    @commands.Cog.listener()
-    async def on_pomice_track_stuck(self, player, track, threshold):
-        if player.bound_channel:
-            await player.bound_channel.send(embed=error_embed("The track got stuck. Skipping to the next track."))
-        await player.stop()
-
-    @commands.Cog.listener()
-    async def on_pomice_track_exception(self, player, track, error):
-        if player.bound_channel:
-            await player.bound_channel.send(embed=error_embed(f"An error occurred while playing the track: {error}"))
-        await player.stop()
-
-    @commands.Cog.listener()
-    async def on_voice_state_update(self, member, before, after):
-        if member.id != self.bot.user.id:
-            return
-            
-        if before.channel and not after.channel:
-            player = self.bot.node.get_player(member.guild.id)
-            if player:
-                if player in self.player_guilds:
-                    del self.player_guilds[player]
-                await player.teardown()
-
 async def setup(bot):
     await bot.add_cog(Music(bot))
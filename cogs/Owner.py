@@ -0,0 +1,118 @@
+import logging
+from discord.ext import commands
+
+from utils.embeds import base_embed
+
+logger = logging.getLogger(__name__)
+
+class Owner(commands.Cog):
+    """Owner-only diagnostics."""
+    def __init__(self, bot):
+        self.bot = bot
+
+    async def cog_check(self, ctx):
+        return await self.bot.is_owner(ctx.author)
+
+    @commands.command(name="cachestats", hidden=True)
+    async def cachestats(self, ctx):
+        """Show search cache hit/miss counters."""
+        stats = self.bot.track_resolver.stats()
+
+        embed = base_embed(title="Search Cache")
+        embed.add_field(name="Hits", value=stats["hits"], inline=True)
+        embed.add_field(name="Misses", value=stats["misses"], inline=True)
+        embed.add_field(name="Hit Rate", value=f"{stats['hit_rate']:.1%}", inline=True)
+        embed.add_field(name="Coalesced", value=stats["coalesced"], inline=True)
+        embed.add_field(name="Track Store Hits", value=stats["stored"], inline=True)
+        embed.add_field(name="Lavalink Requests", value=stats["requests"], inline=True)
+        embed.add_field(name="Entries", value=f"{stats['entries']} ({stats['bytes'] / 1024 / 1024:.1f} MiB)", inline=True)
+
+        await ctx.send(embed=embed)
+
+    @commands.command(name="clusterstats", hidden=True)
+    async def clusterstats(self, ctx):
+        """Show players and guilds summed across every cluster."""
+        await self.bot.cluster_stats.publish(self.bot)
+        clusters = await self.bot.cluster_stats.collect()
+        totals = self.bot.cluster_stats.total(clusters)
+
+        embed = base_embed(title="Cluster Stats")
+        embed.add_field(name="Clusters", value=totals["clusters"], inline=True)
+        embed.add_field(name="Shards", value=totals["shards"], inline=True)
+        embed.add_field(name="Guilds", value=totals["guilds"], inline=True)
+        embed.add_field(name="Players", value=f"{totals['players']} ({totals['playing']} playing)", inline=True)
+        embed.add_field(name="Queued Tracks", value=totals["queued"], inline=True)
+        embed.add_field(name="Memory", value=f"{totals['memory'] / 1024 / 1024:.0f} MiB", inline=True)
+
+        lines = []
+        for cluster_id, stats in sorted(clusters.items()):
+            shards = stats["shards"]
+            span = f"{shards[0]}-{shards[-1]}" if shards else "none"
+            lines.append(
+                f"`{cluster_id}` shards {span} | "
+                f"{stats['guilds']} guilds | {stats['players']} players | {stats['latency'] * 1000:.0f}ms"
+            )
+        embed.description = "\n".join(lines)
+
+        await ctx.send(embed=embed)
+
+    @commands.command(name="snapshotstats", hidden=True)
+    async def snapshotstats(self, ctx):
+        """Show player snapshot write and restore costs."""
+        if not self.bot.snapshots:
+            return await ctx.send(embed=base_embed(description="Player snapshots are disabled."))
+        stats = self.bot.snapshots.stats()
+
+        embed = base_embed(title="Player Snapshots")
+        embed.add_field(name="Writes", value=f"{stats['writes']} ({stats['records']} records)", inline=True)
+        embed.add_field(name="Average Write", value=f"{stats['average_write_seconds'] * 1000:.1f}ms", inline=True)
+        embed.add_field(name="Last Write", value=f"{stats['last_write_seconds'] * 1000:.1f}ms", inline=True)
+        embed.add_field(name="Journal", value=f"{stats['journal_bytes'] / 1024:.1f} KiB", inline=True)
+        embed.add_field(name="Restored", value=f"{stats['restored']}/{stats['restore_total']} players", inline=True)
+        embed.add_field(name="Restore Time", value=f"{stats['restore_seconds']:.2f}s", inline=True)
+
+        await ctx.send(embed=embed)
+
+    @commands.command(name="lag", hidden=True)
+    async def lag(self, ctx, action: str = None):
+        """Show event loop lag and what has blocked the loop the longest."""
+        watchdog = self.bot.watchdog
+        if action == "reset":
+            watchdog.reset()
+            return await ctx.send(embed=base_embed(description="Cleared loop stall history."))
+
+        embed = base_embed(title="Event Loop")
+        embed.add_field(name="Current Lag", value=f"{watchdog.lag * 1000:.1f}ms", inline=True)
+        embed.add_field(name="Max Lag", value=f"{watchdog.max_lag * 1000:.1f}ms", inline=True)
+        embed.add_field(name="Threshold", value=f"{watchdog.threshold * 1000:.0f}ms", inline=True)
+
+        lines = []
+        for label, entry in watchdog.top():
+            lines.append(
+                f"`{entry['total'] * 1000:.0f}ms` total, {entry['count']}x, "
+                f"max `{entry['max'] * 1000:.0f}ms` - {label}"
+            )
+        embed.description = "\n".join(lines) or "No stalls recorded."
+
+        top = watchdog.top(1)
+        if top:
+            embed.add_field(name="Worst Stack", value=f"```py\n{top[0][1]['stack'][-1000:]}```", inline=False)
+
+        await ctx.send(embed=embed)
+
+    @commands.command(name="profiler", hidden=True)
+    async def profiler(self, ctx, action: str = "report"):
+        """Start, stop or report the sampling profiler."""
+        profiler = self.bot.watchdog.profiler
+        if action == "start":
+            profiler.start()
+            return await ctx.send(embed=base_embed(description=f"Sampling every {profiler.interval * 1000:.0f}ms."))
+        if action == "stop":
+            profiler.stop()
+
+        lines = [f"`{share:.1%}` {label}" for label, share in profiler.top(15)]
+        embed = base_embed(title=f"Profiler ({profiler.total} samples)", description="\n".join(lines) or "No samples.")
+        await ctx.send(embed=embed)
+
+async def setup(bot):
+    await bot.add_cog(Owner(bot))
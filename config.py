@@ -1,4 +1,5 @@
 import os
+import json
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -14,7 +15,89 @@ class Config:
         "identifier": os.getenv("LAVALINK_IDENTIFIER", "MAIN"),
         "secure": os.getenv("LAVALINK_SECURE", "false").lower() == "true"
     }
+    # JSON list of node objects with the same keys as LAVALINK
+    LAVALINK_NODES = json.loads(os.getenv("LAVALINK_NODES", "null")) or [LAVALINK]
+    LAVALINK_MAX_PLAYERS = int(os.getenv("LAVALINK_MAX_PLAYERS", 0))
+    LAVALINK_HEALTH_INTERVAL = float(os.getenv("LAVALINK_HEALTH_INTERVAL", 1))
+    # Seconds Lavalink keeps players playing after the bot disconnects, 0 disables resuming
+    LAVALINK_RESUME_TIMEOUT = int(os.getenv("LAVALINK_RESUME_TIMEOUT", 60))
+    LAVALINK_SESSION_PATH = os.getenv("LAVALINK_SESSION_PATH", "data/lavalink-sessions-{cluster}.json")
+    # Seconds a shutdown waits for running commands to finish
+    SHUTDOWN_DRAIN_TIMEOUT = float(os.getenv("SHUTDOWN_DRAIN_TIMEOUT", 10))
     
     DEFAULT_VOLUME = int(os.getenv("DEFAULT_VOLUME", 65))
     
+    METADATA_FILTER_URL = os.getenv("METADATA_FILTER_URL", "https://metadata-filter.vercel.app/api/youtube")
+    METADATA_FILTER_CONCURRENCY = int(os.getenv("METADATA_FILTER_CONCURRENCY", 8))
+    METADATA_CACHE_SIZE = int(os.getenv("METADATA_CACHE_SIZE", 10000))
+    METADATA_CACHE_TTL = int(os.getenv("METADATA_CACHE_TTL", 86400))
+    
+    PLAYLIST_BATCH_SIZE = int(os.getenv("PLAYLIST_BATCH_SIZE", 100))
+    PLAYLIST_PROGRESS_INTERVAL = float(os.getenv("PLAYLIST_PROGRESS_INTERVAL", 2))
+    
+    SEARCH_CACHE_TTL = int(os.getenv("SEARCH_CACHE_TTL", 600))
+    SEARCH_CACHE_ENTRIES = int(os.getenv("SEARCH_CACHE_ENTRIES", 5000))
+    SEARCH_CACHE_BYTES = int(os.getenv("SEARCH_CACHE_BYTES", 64 * 1024 * 1024))
+    
+    # SQLite store of resolved URLs, leave empty to disable
+    TRACK_STORE_PATH = os.getenv("TRACK_STORE_PATH", "data/tracks.db")
+    TRACK_STORE_MAX_ENTRIES = int(os.getenv("TRACK_STORE_MAX_ENTRIES", 200000))
+    # Most played stored tracks loaded into the search cache on startup
+    TRACK_STORE_WARM = int(os.getenv("TRACK_STORE_WARM", 1000))
+    
+    OUTBOUND_CHANNEL_RATE = int(os.getenv("OUTBOUND_CHANNEL_RATE", 5))
+    OUTBOUND_CHANNEL_PER = float(os.getenv("OUTBOUND_CHANNEL_PER", 5))
+    OUTBOUND_GLOBAL_RATE = int(os.getenv("OUTBOUND_GLOBAL_RATE", 40))
+    OUTBOUND_DEBOUNCE = float(os.getenv("OUTBOUND_DEBOUNCE", 0.5))
+    OUTBOUND_MAX_PENDING = int(os.getenv("OUTBOUND_MAX_PENDING", 20))
+    
+    # Queued tracks prepared ahead of playback, 0 disables the lookahead
+    LOOKAHEAD_DEPTH = int(os.getenv("LOOKAHEAD_DEPTH", 3))
+    
+    TIMER_WHEEL_TICK = float(os.getenv("TIMER_WHEEL_TICK", 1))
+    PANEL_REFRESH_INTERVAL = float(os.getenv("PANEL_REFRESH_INTERVAL", 10))
+    
+    # Append-only player state journal, {cluster} is replaced with the cluster ID; leave empty to disable
+    SNAPSHOT_PATH = os.getenv("SNAPSHOT_PATH", "data/snapshots-{cluster}.jsonl")
+    SNAPSHOT_INTERVAL = float(os.getenv("SNAPSHOT_INTERVAL", 5))
+    # Journal size in bytes above which it is rewritten with only the live players
+    SNAPSHOT_COMPACT_BYTES = int(os.getenv("SNAPSHOT_COMPACT_BYTES", 4 * 1024 * 1024))
+    
+    # Seconds before an idle player disconnects, 0 disables the policy
+    IDLE_EMPTY_TIMEOUT = float(os.getenv("IDLE_EMPTY_TIMEOUT", 120))
+    IDLE_QUEUE_TIMEOUT = float(os.getenv("IDLE_QUEUE_TIMEOUT", 300))
+    IDLE_PAUSED_TIMEOUT = float(os.getenv("IDLE_PAUSED_TIMEOUT", 1800))
+    IDLE_CHECK_INTERVAL = float(os.getenv("IDLE_CHECK_INTERVAL", 15))
+    
+    # Set to 0 to disable the Prometheus /metrics endpoint
+    METRICS_PORT = int(os.getenv("METRICS_PORT", 9100))
+    METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+    
+    LOOP_LAG_INTERVAL = float(os.getenv("LOOP_LAG_INTERVAL", 0.5))
+    LOOP_LAG_THRESHOLD = float(os.getenv("LOOP_LAG_THRESHOLD", 0.1))
+    PROFILER_INTERVAL = float(os.getenv("PROFILER_INTERVAL", 0.005))
+    
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+    # "text" or "json" (one object per line, with guild/command/node fields)
+    LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()
+    LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", 10000))
+    # JSON object mapping logger names or event names to the fraction of records to keep
+    LOG_SAMPLE_RATES = json.loads(os.getenv("LOG_SAMPLE_RATES", "{}"))
+    
+    # "lean" requests only what a music bot needs, "full" requests every intent
+    INTENTS_PROFILE = os.getenv("INTENTS_PROFILE", "lean").lower()
+    MESSAGE_CONTENT_INTENT = os.getenv("MESSAGE_CONTENT_INTENT", "true").lower() == "true"
+    MEMORY_REPORT_INTERVAL = float(os.getenv("MEMORY_REPORT_INTERVAL", 300))
+    
+    # Jishaku is loaded only when enabled and installed
+    LOAD_JISHAKU = os.getenv("LOAD_JISHAKU", "true").lower() == "true"
+    # "auto" syncs slash commands only when the command tree changed, or "always"/"never"
+    COMMAND_SYNC = os.getenv("COMMAND_SYNC", "auto").lower()
+    COMMAND_HASH_FILE = os.getenv("COMMAND_HASH_FILE", ".command_tree.hash")
+    
+    SHARD_COUNT = int(os.getenv("SHARD_COUNT", 0)) or None
+    SHARDS_PER_CLUSTER = int(os.getenv("SHARDS_PER_CLUSTER", 8))
+    CLUSTER_START_DELAY = float(os.getenv("CLUSTER_START_DELAY", 5))
+    CLUSTER_STATS_INTERVAL = float(os.getenv("CLUSTER_STATS_INTERVAL", 15))
+    
     STATUS_MESSAGE = os.getenv("STATUS_MESSAGE", "Playing Music on iOS")
@@ -1,60 +1,293 @@
 import os
+import json
 import time
+import signal
 import asyncio
+import hashlib
+import contextlib
 import discord
 from discord.ext import commands
-import jishaku
 
 from config import Config
+from core.cluster import ClusterStats
+from core.events import EventHandler
+from core.metadata import MetadataFilter
+from core.nodes import NodeManager
+from core.outbound import MessageScheduler
+from core.resolver import TrackResolver
+from core.snapshots import PlayerSnapshots
+from core.store import TrackStore
+from core.timers import TimerWheel
+from utils.helpers import get_memory_usage, format_bytes
+from utils import metrics
 from utils.logging import setup_logger
+from utils.watchdog import LoopWatchdog
 from utils.errors import setup_error_handlers
 
 logger = setup_logger(__name__)
 
-class MusicBot(commands.Bot):
-    def __init__(self):
-        intents = discord.Intents.all()
+class MusicBot(commands.AutoShardedBot):
+    def __init__(self, *, shard_ids=None, shard_count=None, cluster_id=0, cluster_registry=None):
+        intents, member_cache_flags = self._build_intents()
         super().__init__(
             command_prefix=Config.PREFIX,
             intents=intents,
+            member_cache_flags=member_cache_flags,
+            chunk_guilds_at_startup=Config.INTENTS_PROFILE == "full",
             case_insensitive=True,
-            help_command=None 
+            help_command=None,
+            owner_ids=set(Config.OWNER_IDS),
+            shard_ids=shard_ids,
+            shard_count=shard_count or Config.SHARD_COUNT
         )
         
         self.start_time = time.time()
-        jishaku.Flags.OWNER_IDS = Config.OWNER_IDS
-        self.lavalink_node = None
+        self.startup_timings = {}
+        self._boot = time.perf_counter()
         self.config = Config
+        self.cluster_id = cluster_id
+        self.node_manager = NodeManager(self)
+        self.metadata_filter = MetadataFilter()
+        self.track_store = TrackStore() if Config.TRACK_STORE_PATH else None
+        self.track_resolver = TrackResolver(store=self.track_store)
+        self.messages = MessageScheduler()
+        self.timer_wheel = TimerWheel(tick=Config.TIMER_WHEEL_TICK)
+        self.snapshots = PlayerSnapshots(self) if Config.SNAPSHOT_PATH else None
+        self.cluster_stats = ClusterStats(cluster_registry, cluster_id)
+        self.events = EventHandler(self)
+        self.metrics_server = None
+        self.watchdog = LoopWatchdog()
+        self._register_metrics()
+        self._memory_task = None
+        self._setup_done = self._boot
+        self.draining = False
+        self._in_flight = set()
+        self.add_check(self._accepting_commands)
+        self.add_listener(self._command_finished, "on_command_error")
+    
+    def _register_metrics(self):
+        """Point the scrape-time gauges at this bot's state."""
+        metrics.PLAYERS.set_function(lambda: sum(1 for _ in self.node_manager.players))
+        metrics.QUEUE_DEPTH.set_function(lambda: sum(len(player.queue) for player in self.node_manager.players))
+        metrics.CACHE_HITS.set_function(lambda: {
+            ("search",): self.track_resolver.cache.hits,
+            ("metadata",): self.metadata_filter.cache.hits,
+        })
+        metrics.CACHE_MISSES.set_function(lambda: {
+            ("search",): self.track_resolver.cache.misses,
+            ("metadata",): self.metadata_filter.cache.misses,
+        })
+    
+    @staticmethod
+    def _build_intents():
+        """Build the gateway intents and member cache policy for the configured profile."""
+        if Config.INTENTS_PROFILE == "full":
+            return discord.Intents.all(), discord.MemberCacheFlags.all()
         
+        intents = discord.Intents.none()
+        intents.guilds = True
+        intents.voice_states = True
+        intents.guild_messages = True
+        intents.message_content = Config.MESSAGE_CONTENT_INTENT
+        return intents, discord.MemberCacheFlags(voice=True, joined=False)
+        
+    @contextlib.contextmanager
+    def _timed(self, phase):
+        """Record how long a startup phase takes."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.startup_timings[phase] = time.perf_counter() - started
+    
     async def start(self):
         """Start the bot."""
-        await self._load_extensions()
-        await setup_error_handlers(self)
-        await super().start("")
+        try:
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, lambda: asyncio.create_task(self.shutdown()))
+        except (NotImplementedError, RuntimeError):
+            pass
+        with self._timed("extensions"):
+            await self._load_extensions()
+        with self._timed("error_handlers"):
+            await setup_error_handlers(self)
+        await super().start(Config.TOKEN)
     
-    async def _load_extensions(self):
-        """Load all extensions."""
+    async def _load_jishaku(self):
+        if not Config.LOAD_JISHAKU:
+            return
+        try:
+            import jishaku
+        except ImportError:
+            logger.warning("LOAD_JISHAKU is set but jishaku is not installed")
+            return
+        
+        jishaku.Flags.OWNER_IDS = Config.OWNER_IDS
         await self.load_extension('jishaku')
         logger.info("Loaded jishaku extension")
+    
+    async def _load_cog(self, cog_name):
+        try:
+            await self.load_extension(cog_name)
+            logger.info(f"Loaded extension: {cog_name}")
+        except Exception as e:
+            logger.error(f"Failed to load extension {cog_name}: {e}")
+    
+    async def _load_extensions(self):
+        """Load all extensions concurrently."""
+        cogs = [
+            f'cogs.{filename[:-3]}' for filename in sorted(os.listdir('./cogs'))
+            if filename.endswith('.py') and not filename.startswith('_')
+        ]
+        await asyncio.gather(self._load_jishaku(), *(self._load_cog(cog_name) for cog_name in cogs))
+    
+    def _command_tree_hash(self):
+        """Hash the slash command payload Discord would receive from a sync."""
+        payload = [command.to_dict(self.tree) for command in self.tree.get_commands()]
+        data = json.dumps([self.application_id, payload], sort_keys=True, default=str)
+        return hashlib.sha256(data.encode()).hexdigest()
+    
+    async def _sync_commands(self):
+        """
+        Sync slash commands if the command tree changed since the last sync.
+        
+        Commands are global, so only the first cluster syncs them.
         
-        for filename in os.listdir('./cogs'):
-            if filename.endswith('.py') and not filename.startswith('_'):
-                cog_name = f'cogs.{filename[:-3]}'
-                try:
-                    await self.load_extension(cog_name)
-                    logger.info(f"Loaded extension: {cog_name}")
-                except Exception as e:
-                    logger.error(f"Failed to load extension {cog_name}: {e}")
+        Returns:
+            True if the tree was synced
+        """
+        if Config.COMMAND_SYNC == "never" or self.cluster_id != 0:
+            return False
+        
+        digest = self._command_tree_hash()
+        if Config.COMMAND_SYNC == "auto":
+            try:
+                with open(Config.COMMAND_HASH_FILE) as f:
+                    if f.read().strip() == digest:
+                        logger.info("Slash commands are unchanged, skipping sync")
+                        return False
+            except FileNotFoundError:
+                pass
+        
+        await self.tree.sync()
+        with open(Config.COMMAND_HASH_FILE, "w") as f:
+            f.write(digest)
+        logger.info("Slash commands have been synced")
+        return True
+    
+    async def _accepting_commands(self, ctx):
+        if self.draining:
+            raise commands.CommandError("The bot is restarting, please try again in a moment.")
+        return True
+    
+    async def shutdown(self, resume=True):
+        """
+        Shut down for a restart without interrupting playback.
+        
+        New commands are refused and running ones get up to
+        SHUTDOWN_DRAIN_TIMEOUT seconds to finish. With resume set and
+        Lavalink session resuming enabled, players are handed over to the
+        node so audio keeps streaming until the next process reattaches.
+        
+        Args:
+            resume: Whether to keep players playing on the node
+        """
+        if self.draining:
+            return
+        self.draining = True
+        started = time.perf_counter()
+        logger.info(f"Shutting down, waiting for {len(self._in_flight)} running command(s)")
+        
+        deadline = started + Config.SHUTDOWN_DRAIN_TIMEOUT
+        while self._in_flight and time.perf_counter() < deadline:
+            await asyncio.sleep(0.1)
+        if self._in_flight:
+            logger.warning(f"Shutting down with {len(self._in_flight)} command(s) still running")
+        
+        if resume and self.node_manager.resume_timeout:
+            await self.node_manager.save_sessions()
+            detached = self.node_manager.detach()
+            logger.info(f"Handed {detached} player(s) over to Lavalink for {self.node_manager.resume_timeout}s")
+        
+        await self.close()
+        logger.info(f"Shutdown took {time.perf_counter() - started:.2f}s")
+    
+    async def close(self):
+        """Close the bot and release shared resources."""
+        if self.snapshots:
+            await self.snapshots.stop()
+        self.cluster_stats.stop()
+        self.timer_wheel.stop()
+        self.watchdog.stop()
+        self.messages.close()
+        if self._memory_task:
+            self._memory_task.cancel()
+        if self.metrics_server:
+            await self.metrics_server.stop()
+        await self.node_manager.close()
+        await self.metadata_filter.close()
+        if self.track_store:
+            await self.track_store.close()
+        await super().close()
     
     async def setup_hook(self):
         """Setup hook that runs before the bot starts processing events."""
-        await self.tree.sync()
-        logger.info("Slash commands have been synced")
+        self.startup_timings["login"] = time.perf_counter() - self._boot - sum(self.startup_timings.values())
+        with self._timed("command_sync"):
+            await self._sync_commands()
+        if self.track_store:
+            with self._timed("track_store"):
+                await self.track_store.open()
+                warmed = await self.track_resolver.warm(Config.TRACK_STORE_WARM)
+                logger.info(f"Warmed search cache with {warmed} stored tracks")
+        with self._timed("services"):
+            self.timer_wheel.start()
+            self.watchdog.start()
+            self.cluster_stats.start(self)
+            if self.snapshots:
+                self.snapshots.start()
+            
+            if Config.METRICS_PORT:
+                self.metrics_server = metrics.MetricsServer(Config.METRICS_HOST, Config.METRICS_PORT + self.cluster_id)
+                await self.metrics_server.start()
+        self._setup_done = time.perf_counter()
+    
+    async def on_command(self, ctx):
+        """Start timing a command."""
+        ctx.started_at = time.perf_counter()
+        self._in_flight.add(ctx)
+    
+    async def on_command_completion(self, ctx):
+        """Record how long a command took."""
+        metrics.observe_command(ctx)
+        await self._command_finished(ctx)
+    
+    async def _command_finished(self, ctx, error=None):
+        self._in_flight.discard(ctx)
     
     async def on_ready(self):
         """Event that triggers when the bot is ready."""
         logger.info(f"Logged in as {self.user.name} ({self.user.id})")
         logger.info(f"Discord.py version: {discord.__version__}")
         
+        if self._memory_task is None:
+            self.startup_timings["gateway"] = time.perf_counter() - self._setup_done
+            logger.info(f"Startup took {time.perf_counter() - self._boot:.2f}s ({self._timing_report()})")
+            logger.info(f"Startup memory: {self._memory_report()}")
+            self._memory_task = asyncio.create_task(self._report_memory())
+        
         activity = discord.Game(name=self.config.STATUS_MESSAGE)
         await self.change_presence(activity=activity)
+    
+    def _timing_report(self):
+        return ", ".join(f"{phase} {seconds * 1000:.0f}ms" for phase, seconds in self.startup_timings.items())
+    
+    def _memory_report(self):
+        rss = get_memory_usage()
+        guilds = len(self.guilds) or 1
+        return f"{format_bytes(rss)} RSS across {len(self.guilds)} guilds ({format_bytes(rss / guilds)} per guild)"
+    
+    async def _report_memory(self):
+        """Periodically log steady-state memory usage."""
+        while not self.is_closed():
+            await asyncio.sleep(Config.MEMORY_REPORT_INTERVAL)
+            logger.info(f"Memory: {self._memory_report()}")
@@ -0,0 +1,200 @@
+import time
+import signal
+import asyncio
+import threading
+import multiprocessing
+import requests
+
+from config import Config
+from utils.helpers import get_memory_usage
+from utils.logging import setup_logger
+
+logger = setup_logger(__name__)
+
+# Seconds a cluster gets to close on top of SHUTDOWN_DRAIN_TIMEOUT before it is killed
+STOP_GRACE = 15
+
+def recommended_shards(token):
+    """
+    Ask Discord how many shards the bot should run.
+
+    Args:
+        token: The bot token
+
+    Returns:
+        The recommended shard count
+    """
+    response = requests.get(
+        "https://discord.com/api/v10/gateway/bot",
+        headers={"Authorization": f"Bot {token}"},
+        timeout=10
+    )
+    response.raise_for_status()
+    return response.json()["shards"]
+
+def shard_ranges(shard_count, shards_per_cluster):
+    """
+    Split shard IDs into contiguous ranges, one per cluster.
+
+    Args:
+        shard_count: The total number of shards
+        shards_per_cluster: The number of shards each cluster runs
+
+    Returns:
+        A list of shard ID lists
+    """
+    return [
+        list(range(start, min(start + shards_per_cluster, shard_count)))
+        for start in range(0, shard_count, shards_per_cluster)
+    ]
+
+class ClusterStats:
+    """
+    Publishes this cluster's stats to a registry shared by every cluster
+    and aggregates the registry for owner commands.
+    """
+    def __init__(self, registry=None, cluster_id=0):
+        self.registry = registry if registry is not None else {}
+        self.cluster_id = cluster_id
+        self._task = None
+
+    @staticmethod
+    def local(bot):
+        """Collect stats for the cluster's own shards."""
+        players = list(bot.node_manager.players)
+        return {
+            "cluster": bot.cluster_id,
+            "shards": list(bot.shards),
+            "guilds": len(bot.guilds),
+            "players": len(players),
+            "playing": sum(1 for player in players if player.is_playing),
+            "queued": sum(len(player.queue) for player in players),
+            "latency": bot.latency,
+            "memory": get_memory_usage(),
+            "updated": time.time(),
+        }
+
+    async def publish(self, bot):
+        """Write this cluster's stats to the shared registry."""
+        data = self.local(bot)
+        await asyncio.to_thread(self.registry.__setitem__, self.cluster_id, data)
+
+    async def collect(self):
+        """
+        Read every cluster's last published stats.
+
+        Returns:
+            A dict mapping cluster IDs to their stats
+        """
+        return await asyncio.to_thread(dict, self.registry)
+
+    @staticmethod
+    def total(clusters):
+        """Sum stats across clusters."""
+        keys = ("guilds", "players", "playing", "queued", "memory")
+        totals = {key: sum(stats[key] for stats in clusters.values()) for key in keys}
+        totals["clusters"] = len(clusters)
+        totals["shards"] = sum(len(stats["shards"]) for stats in clusters.values())
+        return totals
+
+    def start(self, bot):
+        """Publish stats every CLUSTER_STATS_INTERVAL seconds."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._publish_loop(bot))
+
+    async def _publish_loop(self, bot):
+        await bot.wait_until_ready()
+        while not bot.is_closed():
+            try:
+                await self.publish(bot)
+            except Exception as e:
+                logger.error(f"Error publishing cluster stats: {e}")
+            await asyncio.sleep(Config.CLUSTER_STATS_INTERVAL)
+
+    def stop(self):
+        """Stop publishing stats."""
+        if self._task:
+            self._task.cancel()
+
+def run_cluster(cluster_id, shard_ids, shard_count, registry):
+    """Entry point of a cluster worker process."""
+    from core.bot import MusicBot
+
+    # Forked from the launcher, so drop its handler until the bot installs its own
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+    bot = MusicBot(
+        shard_ids=shard_ids,
+        shard_count=shard_count,
+        cluster_id=cluster_id,
+        cluster_registry=registry
+    )
+    asyncio.run(bot.start())
+
+def stop_clusters(processes, timeout):
+    """
+    Forward SIGTERM to every cluster and wait for them to shut down.
+
+    Args:
+        processes: The cluster processes by cluster ID
+        timeout: Seconds to wait before killing clusters that are still running
+    """
+    for process in processes.values():
+        if process.is_alive():
+            process.terminate()
+
+    deadline = time.monotonic() + timeout
+    for cluster_id, process in processes.items():
+        process.join(max(0.0, deadline - time.monotonic()))
+        if process.is_alive():
+            logger.warning(f"Cluster {cluster_id} did not shut down in time, killing it")
+            process.kill()
+            process.join()
+
+def launch():
+    """
+    Start one worker process per shard range and restart any that exit.
+
+    SIGTERM and Ctrl+C stop every cluster before the launcher exits, so
+    none are left running on their shards.
+    """
+    shard_count = Config.SHARD_COUNT or recommended_shards(Config.TOKEN)
+    ranges = shard_ranges(shard_count, Config.SHARDS_PER_CLUSTER)
+    logger.info(f"Launching {len(ranges)} cluster(s) for {shard_count} shard(s)")
+
+    stopping = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stopping.set())
+
+    manager = multiprocessing.Manager()
+    registry = manager.dict()
+    processes = {}
+
+    def spawn(cluster_id):
+        process = multiprocessing.Process(
+            target=run_cluster,
+            args=(cluster_id, ranges[cluster_id], shard_count, registry),
+            name=f"cluster-{cluster_id}"
+        )
+        process.start()
+        processes[cluster_id] = process
+        logger.info(f"Started cluster {cluster_id} (shards {ranges[cluster_id]}, pid {process.pid})")
+
+    try:
+        for cluster_id in range(len(ranges)):
+            if stopping.is_set():
+                break
+            spawn(cluster_id)
+            stopping.wait(Config.CLUSTER_START_DELAY)
+
+        while not stopping.wait(5):
+            for cluster_id, process in list(processes.items()):
+                if not process.is_alive():
+                    logger.warning(f"Cluster {cluster_id} exited with code {process.exitcode}, restarting")
+                    registry.pop(cluster_id, None)
+                    spawn(cluster_id)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        logger.info(f"Stopping {len(processes)} cluster(s)")
+        stop_clusters(processes, Config.SHUTDOWN_DRAIN_TIMEOUT + STOP_GRACE)
+        manager.shutdown()
@@ -0,0 +1,194 @@
+import base64
+import struct
+
+# Bit set in the message header when a version byte follows it
+TRACK_INFO_VERSIONED = 1
+LATEST_VERSION = 3
+
+_INT = struct.Struct(">i")
+_USHORT = struct.Struct(">H")
+_LONG = struct.Struct(">q")
+
+class TrackDecodeError(ValueError):
+    """Raised when an encoded track cannot be decoded."""
+
+def _decode_utf(raw):
+    try:
+        return raw.decode("utf-8")
+    except UnicodeDecodeError:
+        # Java's modified UTF-8 writes NUL as C0 80 and characters outside
+        # the BMP as two three-byte surrogates.
+        text = raw.replace(b"\xc0\x80", b"\x00").decode("utf-8", "surrogatepass")
+        return text.encode("utf-16-be", "surrogatepass").decode("utf-16-be")
+
+def _encode_utf(text):
+    if text.isascii() and "\x00" not in text:
+        raw = text.encode("ascii")
+    else:
+        units = text.encode("utf-16-be")
+        chars = "".join(map(chr, struct.unpack(f">{len(units) // 2}H", units)))
+        raw = chars.encode("utf-8", "surrogatepass").replace(b"\x00", b"\xc0\x80")
+    if len(raw) > 0xFFFF:
+        raise ValueError("String is too long to encode")
+    return _USHORT.pack(len(raw)) + raw
+
+def _read_utf(data, pos):
+    size = _USHORT.unpack_from(data, pos)[0]
+    end = pos + 2 + size
+    if end > len(data):
+        raise TrackDecodeError("Encoded track is truncated")
+    return _decode_utf(data[pos + 2:end]), end
+
+def _read_nullable_utf(data, pos):
+    if data[pos]:
+        return _read_utf(data, pos + 1)
+    return None, pos + 1
+
+def read_track(data):
+    """
+    Decode the binary form of a Lavalink track.
+
+    Args:
+        data: The bytes behind a track's base64 string
+
+    Returns:
+        A (info, version, source_fields) tuple. info has the same keys as
+        Lavalink's track info JSON. source_fields holds the source-specific
+        bytes between the source name and the position, if there are any.
+
+    Raises:
+        TrackDecodeError: If the data is not a valid encoded track
+    """
+    if len(data) < 4:
+        raise TrackDecodeError("Encoded track is truncated")
+    header = _INT.unpack_from(data, 0)[0]
+    flags = (header >> 30) & 0x3
+    size = header & 0x3FFFFFFF
+    end = 4 + size
+    if end > len(data):
+        raise TrackDecodeError("Encoded track is truncated")
+
+    data = data[:end]
+    try:
+        if flags & TRACK_INFO_VERSIONED:
+            version, pos = data[4], 5
+        else:
+            version, pos = 1, 4
+        if not 1 <= version <= LATEST_VERSION:
+            raise TrackDecodeError(f"Unsupported encoded track version {version}")
+
+        title, pos = _read_utf(data, pos)
+        author, pos = _read_utf(data, pos)
+        length = _LONG.unpack_from(data, pos)[0]
+        identifier, pos = _read_utf(data, pos + 8)
+        is_stream = data[pos] != 0
+        pos += 1
+        uri = artwork_url = isrc = None
+        if version >= 2:
+            uri, pos = _read_nullable_utf(data, pos)
+        if version >= 3:
+            artwork_url, pos = _read_nullable_utf(data, pos)
+            isrc, pos = _read_nullable_utf(data, pos)
+        source_name, pos = _read_utf(data, pos)
+    except (struct.error, IndexError, UnicodeDecodeError) as e:
+        raise TrackDecodeError(f"Malformed encoded track: {e}") from e
+
+    if pos + 8 > end:
+        raise TrackDecodeError("Encoded track is truncated")
+    source_fields = bytes(data[pos:end - 8])
+    position = _LONG.unpack_from(data, end - 8)[0]
+
+    info = {
+        "identifier": identifier,
+        "isSeekable": not is_stream,
+        "author": author,
+        "length": length,
+        "isStream": is_stream,
+        "position": position,
+        "title": title,
+        "uri": uri,
+        "artworkUrl": artwork_url,
+        "isrc": isrc,
+        "sourceName": source_name,
+    }
+    return info, version, source_fields
+
+def write_track(info, version=LATEST_VERSION, source_fields=b""):
+    """
+    Encode track info in Lavalink's binary track format.
+
+    Args:
+        info: A dict with the keys of Lavalink's track info JSON
+        version: The format version to write (1-3)
+        source_fields: Source-specific bytes, as returned by read_track
+
+    Returns:
+        The encoded bytes
+    """
+    if not 1 <= version <= LATEST_VERSION:
+        raise ValueError(f"Unsupported encoded track version {version}")
+
+    parts = [
+        bytes((version,)),
+        _encode_utf(info["title"]),
+        _encode_utf(info["author"]),
+        _LONG.pack(info["length"]),
+        _encode_utf(info["identifier"]),
+        b"\x01" if info["isStream"] else b"\x00",
+    ]
+    fields = ("uri",) if version == 2 else ("uri", "artworkUrl", "isrc") if version == 3 else ()
+    for field in fields:
+        value = info.get(field)
+        parts.append(b"\x00" if value is None else b"\x01" + _encode_utf(value))
+    parts.append(_encode_utf(info["sourceName"]))
+    parts.append(source_fields)
+    parts.append(_LONG.pack(info.get("position", 0)))
+
+    body = b"".join(parts)
+    return _INT.pack((TRACK_INFO_VERSIONED << 30) | len(body)) + body
+
+def decode(encoded):
+    """
+    Decode a base64 encoded track to its info.
+
+    Raises:
+        TrackDecodeError: If the string is not a valid encoded track
+    """
+    try:
+        data = base64.b64decode(encoded, validate=True)
+    except ValueError as e:
+        raise TrackDecodeError(f"Encoded track is not valid base64: {e}") from e
+    return read_track(data)[0]
+
+def encode(info, version=LATEST_VERSION, source_fields=b""):
+    """Encode track info to a base64 encoded track."""
+    return base64.b64encode(write_track(info, version, source_fields)).decode("ascii")
+
+def decode_many(encoded_tracks):
+    """
+    Decode a batch of encoded tracks.
+
+    Args:
+        encoded_tracks: An iterable of base64 encoded tracks
+
+    Returns:
+        A list of info dicts, with None for any track that could not be decoded
+    """
+    b64decode = base64.b64decode
+    results = []
+    for encoded in encoded_tracks:
+        try:
+            results.append(read_track(b64decode(encoded, validate=True))[0])
+        except (TrackDecodeError, ValueError):
+            results.append(None)
+    return results
+
+def to_track(encoded):
+    """
+    Rebuild a playable pomice track from an encoded track, without a REST call.
+
+    Returns:
+        The track, or None if its source is not one pomice knows
+    """
+    from core.store import build_track
+    return build_track(encoded, decode(encoded))
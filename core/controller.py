@@ -0,0 +1,172 @@
+import time
+import asyncio
+import logging
+import pomice
+from enum import Enum
+
+from core.codec import TrackDecodeError
+from core.track import QueuedTrack
+from utils.embeds import error_embed
+from utils.metrics import TRACK_TRANSITION_LATENCY
+
+logger = logging.getLogger(__name__)
+
+# Track end reasons after which the next track should not be started
+NO_ADVANCE_REASONS = {"REPLACED", "CLEANUP"}
+
+# Play errors caused by the track itself. Anything else, such as the node
+# being unreachable, would fail for every queued track in the same way.
+TRACK_ERRORS = (pomice.TrackLoadError, pomice.TrackInvalidPosition, pomice.NodeRestException, TrackDecodeError)
+
+class PlaybackState(Enum):
+    IDLE = "idle"
+    PLAYING = "playing"
+
+def _same_track(a, b):
+    if a is None or b is None:
+        return False
+    return a is b or getattr(a, "track_id", None) == getattr(b, "track_id", None)
+
+class PlaybackController:
+    """
+    Serializes every playback transition for one guild.
+
+    Commands and pomice events both go through this controller, and each
+    transition runs under a per-guild lock, so a track end can only ever
+    cause one dequeue and one play.
+    """
+    def __init__(self, player):
+        self.player = player
+        self.state = PlaybackState.IDLE
+        self.track = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def bot(self):
+        return self.player.client
+
+    async def start(self, start=0):
+        """
+        Start playing the next queued track if nothing is playing.
+
+        Args:
+            start: Position in milliseconds to start the track at
+        """
+        async with self._lock:
+            if self.state is PlaybackState.PLAYING and self.player.is_playing:
+                return None
+            track = await self._advance(start)
+        self._announce(track)
+        return track
+
+    def attach(self, track):
+        """Treat a track the node is already playing as the current track."""
+        self.track = track
+        self.state = PlaybackState.PLAYING
+
+    async def on_track_end(self, track, reason):
+        """
+        Handle a track ending.
+
+        When the next queued track is started, a queue_advance event is
+        dispatched with the player, the track that ended and the new track.
+
+        Args:
+            track: The track that ended
+            reason: Lavalink's end reason
+        """
+        ended_at = time.perf_counter()
+        reason = str(reason).upper()
+        async with self._lock:
+            if not _same_track(track, self.track) or reason in NO_ADVANCE_REASONS:
+                return None
+
+            if reason == "FINISHED" and self.player.loop:
+                self.player.queue.put_nowait(QueuedTrack.from_track(track))
+
+            next_track = await self._advance()
+            if next_track is not None:
+                TRACK_TRANSITION_LATENCY.observe(time.perf_counter() - ended_at)
+                self.bot.dispatch("queue_advance", self.player, track, next_track)
+        self._announce(next_track)
+        return next_track
+
+    async def on_track_stuck(self, track, threshold):
+        """Skip a track that stopped receiving audio."""
+        logger.warning(
+            f"Track {track.title} got stuck (threshold: {threshold}ms)",
+            extra={"guild": self.player.guild.id, "event": "track_stuck"}
+        )
+        self._notify("The track got stuck. Skipping to the next track.", key="stuck")
+        await self._skip_if_current(track)
+
+    async def on_track_exception(self, track, error):
+        """
+        Report a track that failed to play.
+
+        Lavalink follows the exception with a TrackEndEvent, which starts
+        the next track.
+        """
+        logger.error(
+            f"Error playing track {track.title}: {error}",
+            extra={"guild": self.player.guild.id, "event": "track_exception"}
+        )
+        self._notify(f"An error occurred while playing the track: {error}", key="exception")
+
+    async def skip(self):
+        """Stop the current track. The resulting track end starts the next one."""
+        await self.player.stop()
+
+    async def stop(self):
+        """Stop playback, clear the queue and cancel pending playlist loads."""
+        async with self._lock:
+            self.state = PlaybackState.IDLE
+            self.track = None
+            self.player.cancel_loader()
+            self.player.queue.clear()
+            await self.player.stop()
+
+    async def _skip_if_current(self, track):
+        async with self._lock:
+            if _same_track(track, self.track):
+                await self.player.stop()
+
+    async def _advance(self, start=0):
+        """Dequeue and play the next track. Must be called with the lock held."""
+        while not self.player.queue.empty():
+            entry = self.player.queue.get_nowait()
+            try:
+                track = await self.player.play(entry, start=start)
+            except TRACK_ERRORS as e:
+                logger.error(f"Error processing next track: {e}")
+                self._notify(f"An error occurred while playing the next track: {e}", key="play_error")
+                start = 0
+                continue
+            except Exception as e:
+                # Keep the queue for when a node is reachable again
+                logger.error(
+                    f"Could not start the next track: {e}",
+                    extra={"guild": self.player.guild.id, "event": "play_failed"}
+                )
+                self.player.queue.insert(0, entry)
+                self._notify("Lost connection to the audio server, playback will continue once it is back.", key="play_error")
+                break
+
+            self.track = track
+            self.state = PlaybackState.PLAYING
+            self.player.lookahead.schedule()
+            return track
+
+        self.track = None
+        self.state = PlaybackState.IDLE
+        return None
+
+    def _announce(self, track):
+        """Queue the now-playing update after the transition, off its critical path."""
+        if track is not None:
+            asyncio.get_running_loop().call_soon(self.player.panel.update, True)
+
+    def _notify(self, message, key=None):
+        if not self.player.bound_channel:
+            return
+        self.bot.messages.send(self.player.bound_channel, embed=error_embed(message), coalesce=key)
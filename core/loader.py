@@ -0,0 +1,69 @@
+import asyncio
+import logging
+import time
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+class PlaylistLoader:
+    """
+    Streams the tracks of a playlist into a player's queue in background batches.
+    """
+    def __init__(self, player, tracks, *, requester=None, batch_size=None, on_progress=None):
+        self.player = player
+        self.tracks = tracks
+        self.requester = requester
+        self.batch_size = batch_size or Config.PLAYLIST_BATCH_SIZE
+        self.on_progress = on_progress
+        self.loaded = 0
+        self.task = None
+
+    @property
+    def total(self):
+        """The number of tracks this loader will enqueue."""
+        return len(self.tracks)
+
+    @property
+    def done(self):
+        """Whether the loader has finished or was cancelled."""
+        return self.task is not None and self.task.done()
+
+    def start(self):
+        """Start enqueueing tracks in the background."""
+        self.task = asyncio.create_task(self._run())
+        return self.task
+
+    def cancel(self):
+        """Stop enqueueing. Tracks already in the queue are kept."""
+        if self.task and not self.task.done():
+            self.task.cancel()
+
+    async def _report(self, finished=False):
+        if self.on_progress is None:
+            return
+        try:
+            await self.on_progress(self, finished)
+        except Exception as e:
+            logger.error(f"Error reporting playlist progress: {e}")
+
+    async def _run(self):
+        last_report = time.monotonic()
+        try:
+            for start in range(0, self.total, self.batch_size):
+                batch = self.tracks[start:start + self.batch_size]
+                self.loaded += await self.player.insert_many(batch, requester=self.requester)
+
+                if time.monotonic() - last_report >= Config.PLAYLIST_PROGRESS_INTERVAL:
+                    last_report = time.monotonic()
+                    await self._report()
+
+                await asyncio.sleep(0)
+        except asyncio.CancelledError:
+            logger.info(f"Cancelled playlist load after {self.loaded}/{self.total} tracks")
+            raise
+        finally:
+            if self.player.loader is self:
+                self.player.loader = None
+
+        await self._report(finished=True)
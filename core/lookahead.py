@@ -0,0 +1,133 @@
+import asyncio
+import logging
+import pomice
+
+from config import Config
+from core import codec
+from core.track import QueuedTrack
+from utils.metrics import LOOKAHEAD_TRACKS
+
+logger = logging.getLogger(__name__)
+
+# Sources pomice searches for again on YouTube when they are played
+RESOLVED_SOURCES = (pomice.TrackType.SPOTIFY, pomice.TrackType.APPLE_MUSIC)
+
+class Lookahead:
+    """
+    Prepares the next few queued tracks before they are needed.
+
+    Each track is checked to decode, has its title filtered if that was
+    requested and has not happened yet, and is built into the pomice
+    track that will be played. Spotify and Apple Music tracks are also
+    matched to a playable track ahead of time, which pomice would
+    otherwise do during play. Playing a prepared track is then just the
+    request to Lavalink.
+    """
+    def __init__(self, player, depth=None):
+        self.player = player
+        self.depth = Config.LOOKAHEAD_DEPTH if depth is None else depth
+        # Queue entry -> (title it was prepared with, pomice track)
+        self.prepared = {}
+        self._task = None
+        self._dirty = False
+
+    @property
+    def bot(self):
+        return self.player.client
+
+    def schedule(self):
+        """Prepare the tracks at the front of the queue in the background."""
+        if not self.depth:
+            return
+        if self._task is not None and not self._task.done():
+            self._dirty = True
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        self._dirty = True
+        while self._dirty:
+            self._dirty = False
+            try:
+                await self.prepare()
+            except Exception as e:
+                logger.error(f"Error preparing upcoming tracks: {e}", extra={"guild": self.player.guild.id})
+
+    async def prepare(self):
+        """Prepare every track in the lookahead window that is not ready yet."""
+        upcoming = [track for track in self.player.queue.page(0, self.depth) if isinstance(track, QueuedTrack)]
+        window = set(upcoming)
+        for track in list(self.prepared):
+            if track not in window:
+                del self.prepared[track]
+
+        pending = []
+        for track in upcoming:
+            if track in self.prepared:
+                continue
+            try:
+                codec.decode(track.encoded)
+            except codec.TrackDecodeError as e:
+                self._drop(track, e)
+                continue
+            pending.append(track)
+        if not pending:
+            return
+
+        # A filter still running from insert shares its lookups instead of repeating them
+        await self.bot.metadata_filter.apply([track for track in pending if track.needs_filter])
+        built = await asyncio.gather(*(self._build(track) for track in pending))
+        for track, playable in zip(pending, built):
+            if track in self.player.queue:
+                self.prepared[track] = (track.title, playable)
+
+    async def _build(self, track):
+        playable = track.to_track(self.player.guild)
+        if playable.track_type not in RESOLVED_SOURCES:
+            return playable
+
+        isrc = playable.info.get("isrc")
+        query = f"ytmsearch:{isrc}" if isrc else f"ytmsearch:{playable.title} {playable.author}"
+        try:
+            results = await self.bot.track_resolver.resolve(self.player, query)
+        except Exception as e:
+            logger.warning(f"Could not match {playable.title} ahead of time: {e}")
+            return playable
+
+        if results and not hasattr(results, "tracks"):
+            playable.original = results[0]
+            playable.track_id = results[0].track_id
+        return playable
+
+    def _drop(self, track, error):
+        index = self.player.queue.index(track)
+        if index < 0:
+            return
+        self.player.queue.remove(index)
+        # The next track moves into the window
+        self._dirty = True
+        logger.warning(
+            f"Removed undecodable track {track.title} from the queue: {error}",
+            extra={"guild": self.player.guild.id, "event": "lookahead_drop"}
+        )
+
+    def take(self, track):
+        """
+        Get the prepared pomice track for a queue entry.
+
+        Returns:
+            The prepared track, or None if it is not ready
+        """
+        title, playable = self.prepared.pop(track, (None, None))
+        if playable is None or title != track.title:
+            LOOKAHEAD_TRACKS.inc(result="miss")
+            return None
+        LOOKAHEAD_TRACKS.inc(result="hit")
+        return playable
+
+    def close(self):
+        """Cancel any preparation in progress."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self.prepared.clear()
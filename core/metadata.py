@@ -0,0 +1,144 @@
+import asyncio
+import logging
+import aiohttp
+
+from config import Config
+from utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+class MetadataFilter:
+    """
+    Cleans up YouTube track titles through the metadata-filter API.
+
+    Lookups share one keep-alive connection pool, run with bounded
+    concurrency and are cached, so a title is only sent once per TTL.
+    """
+    def __init__(self, url=None, *, concurrency=None, timeout=5, cache_size=None, cache_ttl=None):
+        self.url = url or Config.METADATA_FILTER_URL
+        self.timeout = timeout
+        self.cache = TTLCache(
+            maxsize=cache_size or Config.METADATA_CACHE_SIZE,
+            ttl=cache_ttl or Config.METADATA_CACHE_TTL
+        )
+        self._concurrency = concurrency or Config.METADATA_FILTER_CONCURRENCY
+        self._semaphore = asyncio.Semaphore(self._concurrency)
+        self._session = None
+        self._pending = {}
+        self._tasks = set()
+
+    @staticmethod
+    def should_filter(track):
+        """Return True if the track's title should be sent through the filter."""
+        source = getattr(track, "source", None) or track.info.get("sourceName", "YouTube")
+        return source == "youtube"
+
+    def _get_session(self):
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self._concurrency, keepalive_timeout=60)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+        return self._session
+
+    async def _fetch(self, title):
+        async with self._semaphore:
+            try:
+                async with self._get_session().get(self.url, params=dict(track=title)) as response:
+                    if response.status != 200:
+                        # Not cached, so the title is looked up again once the API recovers
+                        logger.warning(f"Metadata filter returned HTTP {response.status}")
+                        return None
+
+                    data = await response.json(content_type=None)
+                    if data.get("status") == "success":
+                        return data["data"].get("track") or title
+            except Exception as e:
+                logger.error(f"Error filtering track metadata: {e}")
+                return None
+
+        return title
+
+    async def clean(self, title):
+        """
+        Get the filtered version of a title.
+
+        Args:
+            title: The raw track title
+
+        Returns:
+            The filtered title, or the original title if the lookup fails
+        """
+        cached = self.cache.get(title)
+        if cached is not None:
+            return cached
+
+        future = self._pending.get(title)
+        if future is None:
+            future = asyncio.ensure_future(self._fetch(title))
+            self._pending[title] = future
+            future.add_done_callback(lambda f: self._resolved(title, f))
+
+        result = await asyncio.shield(future)
+        return title if result is None else result
+
+    def _resolved(self, title, future):
+        self._pending.pop(title, None)
+        if not future.cancelled() and future.result() is not None:
+            self.cache.set(title, future.result())
+
+    async def clean_many(self, titles):
+        """
+        Filter several titles at once.
+
+        Args:
+            titles: An iterable of raw track titles
+
+        Returns:
+            A dict mapping each raw title to its filtered title
+        """
+        unique = list(dict.fromkeys(titles))
+        results = await asyncio.gather(*(self.clean(title) for title in unique))
+        return dict(zip(unique, results))
+
+    async def apply(self, tracks):
+        """
+        Rewrite the titles of the given tracks in place.
+
+        Tracks with needs_filter set to False are skipped, since their
+        titles were already filtered or were queued without filtering.
+        """
+        tracks = [track for track in tracks if getattr(track, "needs_filter", True) and self.should_filter(track)]
+        if not tracks:
+            return
+
+        cleaned = await self.clean_many(track.title for track in tracks)
+        for track in tracks:
+            track.title = cleaned.get(track.title, track.title)
+            if hasattr(track, "needs_filter"):
+                track.needs_filter = False
+
+    def schedule(self, tracks):
+        """
+        Rewrite track titles in the background.
+
+        Args:
+            tracks: The tracks whose titles should be filtered
+        """
+        task = asyncio.create_task(self.apply(list(tracks)))
+        self._tasks.add(task)
+        task.add_done_callback(self._task_done)
+        return task
+
+    def _task_done(self, task):
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception():
+            logger.error(f"Error filtering track metadata: {task.exception()}")
+
+    async def close(self):
+        """Cancel pending lookups and close the connection pool."""
+        for task in list(self._tasks):
+            task.cancel()
+        if self._session and not self._session.closed:
+            await self._session.close()
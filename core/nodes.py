@@ -0,0 +1,439 @@
+import os
+import json
+import asyncio
+import logging
+import pomice
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Seconds to wait for a node's "ready" op, which carries its session ID
+SESSION_READY_TIMEOUT = 10
+
+def node_penalty(node):
+    """
+    Calculate a node's load penalty from its reported stats.
+
+    Uses the same weighting as Lavalink's own load balancer: one point per
+    playing player, plus exponential penalties for CPU load and for frames
+    that were missing or empty over the last minute.
+
+    Args:
+        node: The node to score
+
+    Returns:
+        The penalty, lower is better
+    """
+    stats = getattr(node, "stats", None)
+    if stats is None:
+        return len(getattr(node, "players", {}))
+
+    players = max(getattr(stats, "players_active", 0) or 0, len(getattr(node, "players", {})))
+    cores = getattr(stats, "cpu_cores", 1) or 1
+    system_load = getattr(stats, "cpu_system_load", 0) or 0
+    if system_load > 1:
+        system_load /= cores
+    deficit = getattr(stats, "frames_deficit", 0) or 0
+    nulled = getattr(stats, "frames_nulled", 0) or 0
+
+    cpu_penalty = 1.05 ** (100 * system_load) * 10 - 10
+    deficit_penalty = 1.03 ** (500 * (deficit / 3000)) * 600 - 600
+    null_penalty = (1.03 ** (500 * (nulled / 3000)) * 300 - 300) * 2
+
+    return players + cpu_penalty + deficit_penalty + null_penalty
+
+def select_node(nodes, max_players=None):
+    """
+    Pick the least-loaded connected node.
+
+    Args:
+        nodes: The candidate nodes
+        max_players: Skip nodes already hosting this many players
+
+    Returns:
+        The best node, or None if no node can take another player
+    """
+    candidates = [node for node in nodes if getattr(node, "is_connected", False)]
+    if max_players:
+        candidates = [node for node in candidates if len(node.players) < max_players]
+    if not candidates:
+        return None
+    return min(candidates, key=node_penalty)
+
+class NodeManager:
+    """
+    Connects to every configured Lavalink node, places new players on the
+    least-loaded one and moves players off nodes that go down.
+
+    With LAVALINK_RESUME_TIMEOUT set, each node keeps its players playing
+    for that long after the bot disconnects. Session IDs are saved to
+    disk so the next process resumes the same sessions, and players still
+    on a resumed node are kept in resumable until they are reattached.
+    """
+    def __init__(self, bot, nodes=None, session_path=None):
+        self.bot = bot
+        self.configs = nodes or Config.LAVALINK_NODES
+        self.max_players = Config.LAVALINK_MAX_PLAYERS
+        self.resume_timeout = Config.LAVALINK_RESUME_TIMEOUT
+        if session_path is None and Config.LAVALINK_SESSION_PATH:
+            session_path = Config.LAVALINK_SESSION_PATH.format(cluster=getattr(bot, "cluster_id", 0))
+        self.session_path = session_path
+        self.pool = pomice.NodePool()
+        self.nodes = {}
+        self.failed = set()
+        self.resumable = {}
+        # Node identifier -> the session ID it was last seen with
+        self.sessions = {}
+        self._monitor = None
+
+    @property
+    def ready(self):
+        """Whether at least one node is connected."""
+        return any(node.is_connected for node in self.nodes.values())
+
+    def _load_sessions(self):
+        try:
+            with open(self.session_path) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _save_sessions(self, sessions):
+        directory = os.path.dirname(self.session_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp = f"{self.session_path}.tmp"
+        with open(temp, "w") as f:
+            json.dump(sessions, f)
+        os.replace(temp, self.session_path)
+
+    async def _create_node(self, config, session_id=None):
+        identifier = config["identifier"]
+        try:
+            # Built by hand instead of with NodePool.create_node so the
+            # previous session ID can be sent when the websocket connects.
+            node = pomice.Node(
+                pool=self.pool,
+                bot=self.bot,
+                host=config["host"],
+                port=config["port"],
+                password=config["password"],
+                identifier=identifier,
+                secure=config.get("secure", False),
+            )
+            if session_id:
+                node._headers["Session-Id"] = session_id
+            await node.connect()
+            self.pool._nodes[identifier] = node
+            self.nodes[identifier] = node
+            logger.info(f"Lavalink node {identifier} is ready!")
+        except Exception as error:
+            logger.error(f"Failed to initialize Lavalink node {identifier}: {error}")
+            return None
+
+        try:
+            await self._wait_for_session(node)
+        except asyncio.TimeoutError:
+            logger.error(f"Lavalink node {identifier} did not send a session ID")
+            return node
+        self.sessions[identifier] = node._session_id
+        await self._enable_resuming(node, resumed=session_id is not None and node._session_id == session_id)
+        return node
+
+    @staticmethod
+    async def _wait_for_session(node, timeout=SESSION_READY_TIMEOUT):
+        """
+        Wait for pomice to receive the node's session ID.
+
+        Node.connect returns once the websocket is open, but the session ID
+        only arrives with the "ready" op handled by pomice's listener.
+
+        Raises:
+            asyncio.TimeoutError: If no session ID arrives in time
+        """
+        async def session_ready():
+            while not node._session_id:
+                await asyncio.sleep(0.05)
+        await asyncio.wait_for(session_ready(), timeout)
+
+    async def _enable_resuming(self, node, resumed):
+        """
+        Ask the node to keep this session's players after a disconnect,
+        and collect the players a resumed session still has.
+
+        The Session-Id header pomice reconnects with is pointed at the
+        current session, so a dropped websocket resumes it instead of an
+        older one.
+        """
+        if not self.resume_timeout:
+            return
+        session_path = f"sessions/{node._session_id}"
+        try:
+            await node.send(
+                method="PATCH", path=session_path,
+                data={"resuming": True, "timeout": int(self.resume_timeout)}
+            )
+        except Exception as error:
+            logger.error(f"Failed to enable session resuming on Lavalink node {node._identifier}: {error}")
+            node._headers.pop("Session-Id", None)
+            return
+        node._headers["Session-Id"] = node._session_id
+        if not resumed:
+            return
+
+        try:
+            players = await node.send(method="GET", path=f"{session_path}/players")
+        except Exception as error:
+            logger.error(f"Failed to fetch resumed players from Lavalink node {node._identifier}: {error}")
+            return
+        for data in players or []:
+            self.resumable[int(data["guildId"])] = (node, data)
+        logger.info(
+            f"Resumed Lavalink session on node {node._identifier} with {len(players or [])} player(s)",
+            extra={"node": node._identifier}
+        )
+
+    async def connect(self):
+        """
+        Connect to every configured node concurrently.
+
+        Returns:
+            True if at least one node connected
+        """
+        sessions = {}
+        if self.resume_timeout and self.session_path:
+            sessions = await asyncio.to_thread(self._load_sessions)
+
+        await asyncio.gather(*(
+            self._create_node(config, sessions.get(config["identifier"])) for config in self.configs
+            if config["identifier"] not in self.nodes
+        ))
+        if self.nodes:
+            self.start_monitor()
+        if self.resume_timeout:
+            await self.save_sessions()
+        return self.ready
+
+    async def save_sessions(self):
+        """Save every connected node's session ID for the next process to resume."""
+        if not self.session_path:
+            return
+        sessions = {
+            identifier: node._session_id for identifier, node in self.nodes.items()
+            if node.is_connected and node._session_id and node._headers.get("Session-Id") == node._session_id
+        }
+        await asyncio.to_thread(self._save_sessions, sessions)
+
+    def node_for(self, guild_id):
+        """
+        Get the node a guild's new player should be placed on.
+
+        A guild with a player left on a resumed session goes back to that
+        node, so the player can be reattached instead of recreated.
+        """
+        resumable = self.resumable.get(guild_id)
+        if resumable is not None and resumable[0].is_connected:
+            return resumable[0]
+        return self.best_node()
+
+    async def release_resumable(self):
+        """
+        Destroy players left on resumed sessions that were not reattached.
+
+        Returns:
+            The number of players destroyed
+        """
+        released = 0
+        for guild_id, (node, _) in list(self.resumable.items()):
+            del self.resumable[guild_id]
+            if node.get_player(guild_id):
+                continue
+            try:
+                await node.send(method="DELETE", path=f"sessions/{node._session_id}/players/{guild_id}")
+                released += 1
+            except Exception as e:
+                logger.error(f"Failed to destroy unclaimed player {guild_id}: {e}", extra={"guild": guild_id})
+        return released
+
+    def detach(self):
+        """
+        Hand every player over to Lavalink for a restart.
+
+        The players are removed from discord.py's voice clients so closing
+        the bot does not leave their voice channels, and the resumed node
+        session keeps them playing until the next process reattaches.
+
+        Returns:
+            The number of players detached
+        """
+        players = list(self.players)
+        for player in players:
+            self.bot._connection._remove_voice_client(player.guild.id)
+        return len(players)
+
+    def add_node(self, node):
+        """Register an already connected node."""
+        self.nodes[node._identifier] = node
+
+    def best_node(self):
+        """
+        Get the node a new player should be placed on.
+
+        Raises:
+            pomice.NoNodesAvailable: If no node can take another player
+        """
+        node = select_node(self.nodes.values(), self.max_players)
+        if node is None:
+            raise pomice.NoNodesAvailable("There are no nodes available.")
+        return node
+
+    def get_player(self, guild_id):
+        """Find a guild's player on any node."""
+        for node in self.nodes.values():
+            player = node.get_player(guild_id)
+            if player:
+                return player
+        return None
+
+    @property
+    def players(self):
+        """Every player on every node."""
+        for node in self.nodes.values():
+            yield from node.players.values()
+
+    def start_monitor(self):
+        """Start checking node health in the background."""
+        if self._monitor is None or self._monitor.done():
+            self._monitor = asyncio.create_task(self._monitor_nodes())
+
+    async def _monitor_nodes(self):
+        while True:
+            await asyncio.sleep(Config.LAVALINK_HEALTH_INTERVAL)
+            try:
+                await self.check_nodes()
+            except Exception as e:
+                logger.error(f"Error checking Lavalink node health: {e}")
+
+    async def check_nodes(self):
+        """
+        Mark disconnected nodes as failed and move their players elsewhere.
+
+        A node that reconnected with a new session has resuming turned back
+        on and its players, which the new session does not know, moved to
+        a healthy node. A resumed session kept its players, so they stay.
+        """
+        for identifier, node in list(self.nodes.items()):
+            if node.is_connected:
+                if identifier in self.failed:
+                    try:
+                        await self._wait_for_session(node)
+                    except asyncio.TimeoutError:
+                        continue
+                    self.failed.discard(identifier)
+                    logger.info(f"Lavalink node {identifier} has recovered")
+                    if node._session_id == self.sessions.get(identifier):
+                        await self._resumed(node)
+                if node._session_id and node._session_id != self.sessions.get(identifier):
+                    await self._new_session(node)
+                continue
+
+            if identifier not in self.failed:
+                self.failed.add(identifier)
+                # Cleared so the next "ready" op shows whether the session resumed
+                node._session_id = None
+                logger.warning(f"Lavalink node {identifier} is down", extra={"node": identifier})
+
+            if node.players and self.ready:
+                await self.failover(node)
+
+    async def _resumed(self, node):
+        """
+        Take back the players of a node that resumed its session.
+
+        Players that were moved to another node during the outage are
+        still playing on the resumed session, so they are destroyed there.
+        """
+        for player in list(node.players.values()):
+            await player._refresh_endpoint_uri(node._session_id)
+            # Resume a queue that stopped advancing while the node was unreachable
+            await player.controller.start()
+
+        players = await node.send(method="GET", path=f"sessions/{node._session_id}/players")
+        for data in players or []:
+            guild_id = int(data["guildId"])
+            if node.get_player(guild_id) is None:
+                await node.send(method="DELETE", path=f"sessions/{node._session_id}/players/{guild_id}")
+
+    async def _new_session(self, node):
+        """Handle a node that reconnected with a session other than the one it had."""
+        identifier = node._identifier
+        self.sessions[identifier] = node._session_id
+        logger.info(f"Lavalink node {identifier} started a new session", extra={"node": identifier})
+        await self._enable_resuming(node, resumed=False)
+        if node.players:
+            await self.failover(node)
+
+    async def failover(self, node):
+        """
+        Move every player on a node to healthy nodes.
+
+        Args:
+            node: The node that went down, or came back with a new session
+
+        Returns:
+            The number of players that were moved
+        """
+        players = list(node.players.values())
+        results = await asyncio.gather(
+            *(self._migrate(player) for player in players),
+            return_exceptions=True
+        )
+
+        moved = 0
+        for player, result in zip(players, results):
+            if isinstance(result, Exception):
+                logger.error(
+                    f"Failed to move player {player.guild.id} off node {node._identifier}: {result}",
+                    extra={"guild": player.guild.id, "node": node._identifier}
+                )
+            else:
+                moved += 1
+
+        logger.info(f"Moved {moved}/{len(players)} players off Lavalink node {node._identifier}")
+        return moved
+
+    async def _migrate(self, player):
+        node = self.best_node()
+        await player.migrate(node)
+        # Resume a queue that stopped advancing while no node was reachable
+        await player.controller.start()
+
+    async def close(self):
+        """
+        Stop the health monitor and close every node's websocket and HTTP session.
+
+        pomice's Node.disconnect would destroy every player first, so the
+        connections are closed directly. Players are left to Lavalink,
+        which keeps them for a resumed session when resuming is enabled.
+        """
+        if self._monitor:
+            self._monitor.cancel()
+        for identifier, node in self.nodes.items():
+            try:
+                await self._close_node(node)
+            except Exception as e:
+                logger.error(f"Error closing Lavalink node {identifier}: {e}")
+        self.nodes.clear()
+
+    async def _close_node(self, node):
+        node._available = False
+        # Stop the listener first so the closed socket is not treated as an outage
+        if node._task:
+            node._task.cancel()
+            node._task = None
+        if node._websocket:
+            await node._websocket.close()
+        if node._session:
+            await node._session.close()
+        self.pool._nodes.pop(node._identifier, None)
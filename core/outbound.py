@@ -0,0 +1,206 @@
+import time
+import asyncio
+import logging
+from collections import deque
+import discord
+
+from config import Config
+from utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Result of a queued message that was never sent because it was dropped
+# or merged into another one, as opposed to None for a failed send
+DROPPED = object()
+
+class TokenBucket:
+    """
+    Allows up to `rate` acquisitions every `per` seconds.
+    """
+    def __init__(self, rate, per):
+        self.rate = rate
+        self.per = per
+        self.tokens = rate
+        self.updated = time.monotonic()
+
+    async def acquire(self):
+        """Wait until a token is available and take it."""
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate / self.per)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) * self.per / self.rate)
+
+class _Outbound:
+    __slots__ = ("kwargs", "key", "count", "futures", "message")
+
+    def __init__(self, kwargs, key, future, message=None):
+        self.kwargs = kwargs
+        self.key = key
+        self.count = 1
+        self.futures = [future]
+        self.message = message
+
+    def resolve(self, result):
+        for future in self.futures:
+            if not future.done():
+                future.set_result(result)
+
+    def render(self):
+        kwargs = dict(self.kwargs)
+        embed = kwargs.get("embed")
+        if self.count > 1 and embed is not None:
+            embed = embed.copy()
+            embed.set_footer(text=f"Repeated {self.count} times")
+            kwargs["embed"] = embed
+        return kwargs
+
+class _ChannelQueue:
+    __slots__ = ("channel", "items", "keys", "bucket", "task")
+
+    def __init__(self, channel, bucket):
+        self.channel = channel
+        self.items = deque()
+        self.keys = {}
+        self.bucket = bucket
+        self.task = None
+
+class MessageScheduler:
+    """
+    Central outbound queue for messages the bot sends or edits on its own,
+    such as now-playing panels and error notices in a player's bound channel.
+
+    Messages are queued per channel and sent under per-channel and global
+    rate limits. A message sent with `replace` supersedes any pending
+    message with the same key, and one sent with `coalesce` is merged
+    into a pending message with the same key and shown once with a count.
+    """
+    def __init__(self):
+        self.channels = {}
+        self.bucket = TokenBucket(Config.OUTBOUND_GLOBAL_RATE, 1)
+        # Channel buckets outlive their queues until they have fully refilled
+        self.channel_buckets = TTLCache(maxsize=100000, ttl=Config.OUTBOUND_CHANNEL_PER)
+        self.sent = 0
+        self.dropped = 0
+
+    def send(self, channel, *, replace=None, coalesce=None, **kwargs):
+        """
+        Queue a message for a channel.
+
+        Args:
+            channel: The channel to send to
+            replace: Key of a pending message whose content this one replaces
+            coalesce: Key of pending messages this one is merged with
+            **kwargs: Arguments for channel.send
+
+        Returns:
+            A future that resolves to the sent message, DROPPED if it was
+            dropped or merged into another message, or None if sending failed
+        """
+        return self._enqueue(channel, None, replace, coalesce, kwargs)
+
+    def edit(self, message, *, replace=None, **kwargs):
+        """
+        Queue an edit of one of the bot's messages.
+
+        Args:
+            message: The message to edit
+            replace: Key of a pending edit whose content this one replaces
+            **kwargs: Arguments for message.edit
+
+        Returns:
+            A future that resolves to the edited message, DROPPED if the edit
+            was dropped, or None if the edit failed
+        """
+        return self._enqueue(message.channel, message, replace, None, kwargs)
+
+    def _enqueue(self, channel, message, replace, coalesce, kwargs):
+        queue = self.channels.get(channel.id)
+        if queue is None:
+            bucket = self.channel_buckets.pop(channel.id) or TokenBucket(
+                Config.OUTBOUND_CHANNEL_RATE, Config.OUTBOUND_CHANNEL_PER
+            )
+            queue = self.channels[channel.id] = _ChannelQueue(channel, bucket)
+
+        future = asyncio.get_running_loop().create_future()
+        key = replace or coalesce
+        pending = queue.keys.get(key) if key else None
+
+        if pending is not None:
+            if replace:
+                pending.kwargs = kwargs
+                pending.futures.append(future)
+            else:
+                pending.count += 1
+                future.set_result(DROPPED)
+                self.dropped += 1
+            return future
+
+        item = _Outbound(kwargs, key, future, message)
+        queue.items.append(item)
+        if key:
+            queue.keys[key] = item
+
+        while len(queue.items) > Config.OUTBOUND_MAX_PENDING:
+            stale = queue.items.popleft()
+            if stale.key:
+                queue.keys.pop(stale.key, None)
+            self._drop(stale)
+
+        if queue.task is None:
+            queue.task = asyncio.create_task(self._drain(queue))
+        return future
+
+    def _drop(self, item):
+        self.dropped += 1
+        item.resolve(DROPPED)
+
+    async def _drain(self, queue):
+        try:
+            await asyncio.sleep(Config.OUTBOUND_DEBOUNCE)
+            while queue.items:
+                await queue.bucket.acquire()
+                await self.bucket.acquire()
+                if not queue.items:
+                    break
+
+                item = queue.items.popleft()
+                if item.key and queue.keys.get(item.key) is item:
+                    del queue.keys[item.key]
+
+                message = DROPPED
+                try:
+                    if item.message is None:
+                        message = await queue.channel.send(**item.render())
+                    else:
+                        message = await item.message.edit(**item.render())
+                    self.sent += 1
+                except discord.NotFound:
+                    message = None
+                except Exception as e:
+                    logger.error(f"Failed to send message to channel {queue.channel.id}: {e}")
+                    message = None
+                finally:
+                    item.resolve(message)
+        finally:
+            queue.task = None
+            # Items are only left over if the loop was cancelled
+            while queue.items:
+                self._drop(queue.items.popleft())
+            queue.keys.clear()
+            if not queue.items and self.channels.get(queue.channel.id) is queue:
+                del self.channels[queue.channel.id]
+                self.channel_buckets.set(queue.channel.id, queue.bucket)
+
+    def close(self):
+        """Cancel every pending message."""
+        for queue in list(self.channels.values()):
+            if queue.task:
+                queue.task.cancel()
+            for item in queue.items:
+                self._drop(item)
+            queue.items.clear()
+        self.channels.clear()
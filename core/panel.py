@@ -0,0 +1,82 @@
+import logging
+
+from config import Config
+from core.outbound import DROPPED
+from utils.embeds import now_playing_embed
+
+logger = logging.getLogger(__name__)
+
+class NowPlayingPanel:
+    """
+    A single now-playing message per guild that is edited in place.
+
+    Progress is worked out locally from the player's last position update,
+    and refreshes run on the bot's shared timer wheel. Refreshes are
+    skipped while the player is idle or paused, or when the rendered
+    panel would not change.
+    """
+    def __init__(self, player):
+        self.player = player
+        self.message = None
+        self._rendered = None
+        self._timer = None
+
+    @property
+    def bot(self):
+        return self.player.client
+
+    def start(self):
+        """Start refreshing the panel on the timer wheel."""
+        if self._timer is None:
+            self._timer = self.bot.timer_wheel.schedule(Config.PANEL_REFRESH_INTERVAL, self._refresh)
+
+    def close(self):
+        """Stop refreshing the panel."""
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+
+    def _refresh(self):
+        self._timer = None
+        if self.player.is_playing and not self.player.is_paused:
+            self.update()
+        self.start()
+
+    def update(self, force=False):
+        """
+        Render the panel and queue an edit if it changed.
+
+        Args:
+            force: Queue the edit even if the panel looks the same
+        """
+        track = self.player.controller.track
+        channel = self.player.bound_channel
+        if track is None or channel is None:
+            return
+
+        requester = getattr(track, "requester", None) or self.bot.user
+        embed = now_playing_embed(track, requester, position=self.player.position, paused=self.player.is_paused)
+        rendered = embed.to_dict()
+        if not force and rendered == self._rendered:
+            return
+        self._rendered = rendered
+
+        if self.message is None:
+            future = self.bot.messages.send(channel, embed=embed, replace="panel")
+        else:
+            future = self.bot.messages.edit(self.message, embed=embed, replace="panel")
+        future.add_done_callback(self._delivered)
+
+    def _delivered(self, future):
+        if future.cancelled():
+            return
+        message = future.result()
+        if message is DROPPED:
+            # Keep the message, but render again on the next refresh
+            self._rendered = None
+            return
+        if message is not None:
+            self.message = message
+        else:
+            self.message = None
+            self._rendered = None
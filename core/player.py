@@ -1,76 +1,208 @@
-import asyncio
+import time
 import logging
-import requests
 import pomice
 
+from core.controller import PlaybackController
+from core.lookahead import Lookahead
+from core.panel import NowPlayingPanel
+from core.queue import TrackQueue
+from core.reaper import IdleReaper
+from core.track import QueuedTrack
+
 logger = logging.getLogger(__name__)
 
 class MusicPlayer(pomice.Player):
     """
     Custom player class with additional functionality.
     """
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
+    def __init__(self, client=None, channel=None, *, node=None):
+        if node is None and hasattr(client, "node_manager"):
+            node = client.node_manager.node_for(channel.guild.id)
+        super().__init__(client, channel, node=node)
         self.bound_channel = None
         self.message = None
         self.track = None
-        self.queue = asyncio.Queue()
-        self.waiting = False
+        self.queue = TrackQueue()
+        self.controller = PlaybackController(self)
+        self.lookahead = Lookahead(self)
+        self.panel = NowPlayingPanel(self)
+        self.panel.start()
+        self.reaper = IdleReaper(self)
+        self.reaper.start()
         self.loop = False
         self.voice_channel = None
+        self.loader = None
+        self._closing = False
+        
+    async def play(self, track, *, start=0):
+        """
+        Play a track and update the current track reference.
         
-    async def play(self, track):
-        """Play a track and update the current track reference."""
+        Queued tracks are only turned into full pomice tracks here, unless
+        the lookahead already prepared them.
+        
+        Returns:
+            The track being played
+        """
+        if isinstance(track, QueuedTrack):
+            track = self.lookahead.take(track) or track.to_track(self.guild)
         self.track = track
-        await super().play(track)
+        await super().play(track, start=start)
+        return track
+
+    async def migrate(self, node):
+        """
+        Move this player to another node.
+        
+        The queue and loop state live on the player itself, so only the
+        playback state has to be carried over to the new node.
+        
+        Args:
+            node: The node to move to
+        """
+        track = self.current or self.controller.track
+        position = self.position if track else 0
+        volume = self.volume
+        paused = self.is_paused
+        
+        if self.current:
+            await self._swap_node(new_node=node)
+        else:
+            await self._move_idle(node)
+        
+        if track and not self.current:
+            await self.play(track, start=int(position))
+        await self.set_volume(volume)
+        if paused:
+            await self.set_pause(True)
 
-    async def insert(self, track, filter=True):
+    async def _move_idle(self, node):
+        """
+        Move a player that has no current track to another node.
+        
+        pomice's _swap_node assumes a track is playing, so this only
+        re-registers the player and sends its voice state to the new node.
+        """
+        self.node._players.pop(self.guild.id, None)
+        self._node = node
+        node._players[self.guild.id] = self
+        await self._refresh_endpoint_uri(node._session_id)
+        await self._dispatch_voice_update()
+    
+    async def destroy(self):
+        """
+        Destroy the player.
+        
+        When a node's websocket closes pomice destroys every player on it,
+        which would also leave voice. Those players are kept on the node
+        instead so NodeManager can move them to a healthy one.
+        """
+        if not self._closing and not self.node.is_connected:
+            logger.info(
+                f"Keeping player {self.guild.id} for failover after its node disconnected",
+                extra={"guild": self.guild.id}
+            )
+            return
+        await super().destroy()
+    
+    def reattach(self, track, data):
+        """
+        Take over a player that kept playing on a resumed Lavalink session.
+        
+        Nothing is sent to Lavalink, so the track carries on where it is.
+        pomice only records the track a TrackEndEvent refers to when it
+        sees the track start, which happened before this process, so that
+        is set here too.
+        
+        Args:
+            track: The track the node is playing
+            data: The player object Lavalink returned for this guild
+        """
+        if isinstance(track, QueuedTrack):
+            track = track.to_track(self.guild)
+        state = data.get("state", {})
+        self.track = self._current = self._ending_track = track
+        self._volume = data.get("volume", self._volume)
+        self._paused = data.get("paused", False)
+        self._last_position = state.get("position", 0)
+        self._last_update = time.time() * 1000
+        self.controller.attach(track)
+        return track
+    
+    async def insert(self, track, filter=True, requester=None):
         """
         Insert a track into the queue.
         
         Args:
             track: The track to insert
             filter: Whether to filter track metadata (YouTube)
+            requester: The member who queued it, defaults to track.requester
         
         Returns:
-            The track that was inserted
+            The queue entry that was inserted
         """
-        if filter and track.info.get("sourceName", "YouTube") == "youtube":
-            try:
-                response = requests.get(
-                    "https://metadata-filter.vercel.app/api/youtube", 
-                    params=dict(track=track.title),
-                    timeout=5
-                )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    if data.get("status") == "success":
-                        track.title = data["data"].get("track")
-            except Exception as e:
-                logger.error(f"Error filtering track metadata: {e}")
-                
+        track = QueuedTrack.from_track(track, requester)
+        track.needs_filter = filter
         await self.queue.put(track)
+        if filter:
+            self.client.metadata_filter.schedule([track])
+        self.lookahead.schedule()
         return track
     
+    async def insert_many(self, tracks, filter=True, requester=None):
+        """
+        Insert several tracks into the queue.
+        
+        Args:
+            tracks: The tracks to insert
+            filter: Whether to filter track metadata (YouTube)
+            requester: The member who queued them, defaults to each track's requester
+        
+        Returns:
+            The number of tracks inserted
+        """
+        tracks = [QueuedTrack.from_track(track, requester) for track in tracks]
+        for track in tracks:
+            track.needs_filter = filter
+        added = self.queue.extend(tracks)
+        if filter:
+            self.client.metadata_filter.schedule(tracks)
+        self.lookahead.schedule()
+        return added
+    
+    def cancel_loader(self):
+        """Cancel any playlist that is still being added to the queue."""
+        if self.loader:
+            self.loader.cancel()
+            self.loader = None
+    
+    async def teardown(self):
+        """Stop background work for this player and destroy it."""
+        self._closing = True
+        self.cancel_loader()
+        self.panel.close()
+        self.reaper.close()
+        self.lookahead.close()
+        await self.destroy()
+    
     async def skip(self):
         """Skip the current track."""
         await self.stop()
     
     async def clear_queue(self):
         """Clear the queue."""
-        self.queue = asyncio.Queue()
+        self.queue.clear()
     
     @property
     def queue_length(self):
         """Get the number of tracks in the queue."""
-        return len(self.queue._queue)
+        return len(self.queue)
     
     @property
     def queue_list(self):
         """Get a list of tracks in the queue."""
-        return list(self.queue._queue)
+        return list(self.queue)
     
     def get_queue_position(self, track):
         """Get position of a track in the queue."""
-        return self.queue_list.index(track) if track in self.queue_list else -1
+        return self.queue.index(track)
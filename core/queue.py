@@ -0,0 +1,222 @@
+import asyncio
+import random
+from collections import deque
+from itertools import islice
+
+# Dequeued slots kept at the front of the list before it is compacted
+COMPACT_MIN = 64
+
+class TrackQueue:
+    """
+    List-backed track queue with positional access and an awaitable get.
+
+    Tracks are dequeued by advancing a head offset instead of shifting the
+    list, and the consumed slots are dropped once they make up half of
+    it. Every position is a direct list index, so a page from the middle
+    of a long queue costs the same as one from a short queue.
+    """
+    def __init__(self, tracks=None):
+        self._tracks = list(tracks or ())
+        self._head = 0
+        self._getters = deque()
+        self._version = 0
+
+    def __len__(self):
+        return len(self._tracks) - self._head
+
+    def __bool__(self):
+        return len(self._tracks) > self._head
+
+    def __iter__(self):
+        return islice(self._tracks, self._head, None)
+
+    def __contains__(self, track):
+        return self.index(track) >= 0
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._tracks[self._head + i] for i in range(*index.indices(len(self)))]
+        return self._tracks[self._position(index)]
+
+    def _position(self, index):
+        """Map a queue position, which may be negative, to a list index."""
+        size = len(self)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("queue index out of range")
+        return self._head + index
+
+    @property
+    def version(self):
+        """A counter that changes every time the queue is modified."""
+        return self._version
+
+    def _changed(self):
+        self._version += 1
+
+    def _wakeup_next(self):
+        while self._getters:
+            waiter = self._getters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                break
+
+    def empty(self):
+        """Return True if the queue has no tracks."""
+        return not self
+
+    def qsize(self):
+        """Get the number of tracks in the queue."""
+        return len(self)
+
+    def put_nowait(self, track):
+        """Append a track to the end of the queue."""
+        self._tracks.append(track)
+        self._changed()
+        self._wakeup_next()
+
+    async def put(self, track):
+        """Append a track to the end of the queue."""
+        self.put_nowait(track)
+
+    def extend(self, tracks):
+        """
+        Append several tracks to the end of the queue.
+
+        Args:
+            tracks: An iterable of tracks
+
+        Returns:
+            The number of tracks added
+        """
+        before = len(self._tracks)
+        self._tracks.extend(tracks)
+        added = len(self._tracks) - before
+        if added:
+            self._changed()
+            for _ in range(min(added, len(self._getters))):
+                self._wakeup_next()
+        return added
+
+    def get_nowait(self):
+        """
+        Remove and return the track at the front of the queue.
+
+        Raises:
+            asyncio.QueueEmpty: If the queue is empty
+        """
+        tracks, head = self._tracks, self._head
+        if head >= len(tracks):
+            raise asyncio.QueueEmpty
+        track = tracks[head]
+        tracks[head] = None
+        head += 1
+        if head == len(tracks):
+            tracks.clear()
+            head = 0
+        elif head >= COMPACT_MIN and head * 2 >= len(tracks):
+            del tracks[:head]
+            head = 0
+        self._head = head
+        self._changed()
+        return track
+
+    async def get(self):
+        """Remove and return the track at the front of the queue, waiting for one if needed."""
+        while not self:
+            waiter = asyncio.get_running_loop().create_future()
+            self._getters.append(waiter)
+            try:
+                await waiter
+            except BaseException:
+                waiter.cancel()
+                try:
+                    self._getters.remove(waiter)
+                except ValueError:
+                    pass
+                if self and not waiter.cancelled():
+                    self._wakeup_next()
+                raise
+        return self.get_nowait()
+
+    def insert(self, index, track):
+        """
+        Insert a track at a position in the queue.
+
+        Args:
+            index: Zero-based position to insert at
+            track: The track to insert
+        """
+        size = len(self)
+        if index < 0:
+            index = max(0, index + size)
+        self._tracks.insert(self._head + min(index, size), track)
+        self._changed()
+        self._wakeup_next()
+
+    def remove(self, index):
+        """
+        Remove and return the track at a position in the queue.
+
+        Args:
+            index: Zero-based position of the track
+
+        Raises:
+            IndexError: If the position is out of range
+        """
+        position = self._position(index)
+        track = self._tracks.pop(position)
+        self._changed()
+        return track
+
+    def move(self, source, destination):
+        """
+        Move a track from one position in the queue to another.
+
+        Args:
+            source: Zero-based position of the track to move
+            destination: Zero-based position to move it to
+
+        Returns:
+            The track that was moved
+        """
+        track = self._tracks.pop(self._position(source))
+        size = len(self)
+        if destination < 0:
+            destination = max(0, destination + size)
+        self._tracks.insert(self._head + min(destination, size), track)
+        self._changed()
+        return track
+
+    def index(self, track):
+        """Get the position of a track in the queue, or -1 if it is not queued."""
+        try:
+            return self._tracks.index(track, self._head) - self._head
+        except ValueError:
+            return -1
+
+    def page(self, start, count):
+        """
+        Get a slice of the queue without copying the rest of it.
+
+        Args:
+            start: Zero-based position of the first track
+            count: Maximum number of tracks to return
+        """
+        start = self._head + max(start, 0)
+        return self._tracks[start:start + count]
+
+    def shuffle(self):
+        """Shuffle the queue in place."""
+        tracks = self._tracks[self._head:]
+        random.shuffle(tracks)
+        self._tracks[:] = tracks
+        self._head = 0
+        self._changed()
+
+    def clear(self):
+        """Remove every track from the queue."""
+        self._tracks.clear()
+        self._head = 0
+        self._changed()
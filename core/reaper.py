@@ -0,0 +1,89 @@
+import time
+import asyncio
+import logging
+
+from config import Config
+from utils.embeds import success_embed
+from utils.metrics import IDLE_DISCONNECTS
+
+logger = logging.getLogger(__name__)
+
+IDLE_MESSAGES = {
+    "empty": "Left the voice channel because nobody was listening.",
+    "paused": "Left the voice channel because playback was paused for too long.",
+    "finished": "Left the voice channel because the queue has finished.",
+}
+
+class IdleReaper:
+    """
+    Disconnects a player that has been idle for too long.
+
+    Checks run on the bot's shared timer wheel. Each policy tracks when its
+    idle condition started, and the player is torn down once any condition
+    has held for longer than its configured timeout.
+    """
+    def __init__(self, player):
+        self.player = player
+        self.since = {}
+        self._timer = None
+        self._task = None
+
+    @property
+    def bot(self):
+        return self.player.client
+
+    def start(self):
+        """Start checking the player on the timer wheel."""
+        if self._timer is None and self._task is None:
+            self._timer = self.bot.timer_wheel.schedule(Config.IDLE_CHECK_INTERVAL, self._check)
+
+    def close(self):
+        """Stop checking the player."""
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+
+    def _listeners(self):
+        channel = self.player.channel
+        if channel is None:
+            return 0
+        return sum(1 for member in channel.members if not member.bot)
+
+    def _conditions(self):
+        """Yield (policy, timeout, idle) for each idle policy."""
+        player = self.player
+        yield "empty", Config.IDLE_EMPTY_TIMEOUT, self._listeners() == 0
+        yield "paused", Config.IDLE_PAUSED_TIMEOUT, player.is_paused
+        yield "finished", Config.IDLE_QUEUE_TIMEOUT, (
+            not player.is_playing and player.queue.empty() and player.loader is None
+        )
+
+    def _check(self):
+        self._timer = None
+        now = time.monotonic()
+        for policy, timeout, idle in self._conditions():
+            if not timeout or not idle:
+                self.since.pop(policy, None)
+                continue
+
+            since = self.since.setdefault(policy, now)
+            if now - since >= timeout:
+                self._task = asyncio.create_task(self._reap(policy))
+                return
+        self.start()
+
+    async def _reap(self, policy):
+        guild = self.player.guild
+        logger.info(
+            f"Disconnecting idle player in {guild.name} ({policy})",
+            extra={"guild": guild.id, "event": "idle_disconnect"}
+        )
+        IDLE_DISCONNECTS.inc(reason=policy)
+
+        if self.player.bound_channel:
+            self.bot.messages.send(self.player.bound_channel, embed=success_embed(IDLE_MESSAGES[policy]))
+
+        try:
+            await self.player.teardown()
+        except Exception as e:
+            logger.error(f"Failed to disconnect idle player in {guild.name}: {e}", extra={"guild": guild.id})
@@ -0,0 +1,160 @@
+import time
+import asyncio
+import copy
+import logging
+
+from config import Config
+from utils.cache import TTLCache
+from utils.helpers import is_url
+from utils.metrics import LAVALINK_REST_LATENCY
+
+logger = logging.getLogger(__name__)
+
+SEARCH_SOURCES = ("ytsearch", "ytmsearch", "scsearch", "spsearch", "amsearch", "dzsearch")
+
+TRACK_OVERHEAD = 1024
+
+def _estimate_size(results):
+    """Roughly estimate how many bytes a set of search results holds."""
+    tracks = results.tracks if hasattr(results, 'tracks') else results
+    size = 0
+    for track in tracks:
+        size += TRACK_OVERHEAD
+        for attr in ('track_id', 'title', 'author', 'uri', 'identifier'):
+            size += len(getattr(track, attr, None) or '')
+    return size
+
+def _clone(results):
+    """Copy cached results so per-guild changes (requester, title) don't leak between guilds."""
+    if hasattr(results, 'tracks'):
+        playlist = copy.copy(results)
+        playlist.tracks = [copy.copy(track) for track in results.tracks]
+        return playlist
+    return [copy.copy(track) for track in results]
+
+class TrackResolver:
+    """
+    Process-wide cache in front of Lavalink's loadtracks endpoint.
+
+    Identical lookups that arrive while one is in flight share its result.
+    URLs that resolve to a single track are also kept in a TrackStore, if
+    one is given, so they survive restarts and cache expiry.
+    """
+    def __init__(self, *, max_bytes=None, max_entries=None, ttl=None, store=None):
+        self.cache = TTLCache(
+            maxsize=max_entries or Config.SEARCH_CACHE_ENTRIES,
+            ttl=ttl or Config.SEARCH_CACHE_TTL,
+            max_weight=max_bytes or Config.SEARCH_CACHE_BYTES,
+            weigher=_estimate_size
+        )
+        self.coalesced = 0
+        self.store = store
+        self._pending = {}
+
+    @property
+    def store_open(self):
+        """Whether the track store can be used. MusicBot only opens it in setup_hook."""
+        return self.store is not None and self.store.is_open
+
+    @staticmethod
+    def normalize(query):
+        """
+        Build the cache key for a query.
+
+        Args:
+            query: A URL, or a search term with an optional source prefix
+
+        Returns:
+            A (source, term) tuple
+        """
+        query = query.strip()
+        if is_url(query):
+            return ("url", query)
+
+        source, sep, term = query.partition(":")
+        if sep and source.lower() in SEARCH_SOURCES:
+            return (source.lower(), " ".join(term.lower().split()))
+        return ("ytsearch", " ".join(query.lower().split()))
+
+    async def resolve(self, player, query):
+        """
+        Resolve a query to tracks, using the cache where possible.
+
+        Args:
+            player: The player whose node should run the lookup
+            query: A URL, or a search term with an optional source prefix
+
+        Returns:
+            The search results, as returned by pomice
+        """
+        key = self.normalize(query)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return _clone(cached)
+
+        future = self._pending.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._fetch(player, key))
+            self._pending[key] = future
+            future.add_done_callback(lambda f: self._resolved(key, f))
+        else:
+            self.coalesced += 1
+
+        results = await asyncio.shield(future)
+        return _clone(results) if results else results
+
+    async def _fetch(self, player, key):
+        source, term = key
+        if source == "url" and self.store_open:
+            tracks = await self.store.lookup(term)
+            if tracks:
+                return tracks
+
+        query = term if source == "url" else f"{source}:{term}"
+        started = time.perf_counter()
+        try:
+            results = await player.get_tracks(query)
+        finally:
+            LAVALINK_REST_LATENCY.observe(time.perf_counter() - started, node=player.node._identifier)
+
+        if source == "url" and self.store_open and isinstance(results, list) and len(results) == 1:
+            self.store.save(term, results[0])
+        return results
+
+    async def warm(self, count):
+        """
+        Load the most played stored tracks into the cache.
+
+        Args:
+            count: Maximum number of tracks to load
+
+        Returns:
+            The number of tracks loaded
+        """
+        if not self.store_open or count <= 0:
+            return 0
+        pairs = await self.store.hottest(count)
+        for query, track in pairs:
+            self.cache.set(("url", query), [track])
+        return len(pairs)
+
+    def _resolved(self, key, future):
+        self._pending.pop(key, None)
+        if future.cancelled() or future.exception() is not None:
+            return
+        if future.result():
+            self.cache.set(key, future.result())
+
+    def stats(self):
+        """Get cache hit/miss counters and current usage."""
+        lookups = self.cache.hits + self.cache.misses
+        return {
+            "hits": self.cache.hits,
+            "misses": self.cache.misses,
+            "coalesced": self.coalesced,
+            "stored": self.store.hits if self.store is not None else 0,
+            "requests": self.cache.misses - self.coalesced - (self.store.hits if self.store is not None else 0),
+            "hit_rate": self.cache.hits / lookups if lookups else 0.0,
+            "entries": len(self.cache),
+            "bytes": self.cache.weight,
+        }
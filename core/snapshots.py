@@ -0,0 +1,355 @@
+import os
+import json
+import time
+import asyncio
+import logging
+
+import pomice
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from config import Config
+from core import codec
+from core.store import build_track
+from core.track import QueuedTrack
+from utils.metrics import SNAPSHOT_WRITE_LATENCY, SNAPSHOT_BYTES
+
+logger = logging.getLogger(__name__)
+
+# Position drift, in milliseconds, that counts as a seek and forces a new record
+SEEK_TOLERANCE = 5000
+
+def _dumps(record):
+    if orjson is not None:
+        return orjson.dumps(record) + b"\n"
+    return json.dumps(record, separators=(",", ":")).encode() + b"\n"
+
+def _loads(line):
+    return orjson.loads(line) if orjson is not None else json.loads(line)
+
+def _entry(track):
+    """Serialize a queued or playing track as [encoded, title, source, requester ID]."""
+    track = QueuedTrack.from_track(track)
+    return [track.encoded, track.title, track.source, track.requester_id]
+
+def _queued(entry):
+    """Rebuild a queue entry written by _entry."""
+    encoded, title, source, requester_id = entry
+    info = codec.decode(encoded)
+    return QueuedTrack(encoded, title, info["author"], info["length"], pomice.TrackType(source), requester_id)
+
+class SnapshotJournal:
+    """
+    Append-only file of player state records, one JSON object per line.
+
+    Later records for a guild replace earlier ones and a record with
+    "deleted" set removes the guild. Every batch is flushed and fsynced,
+    a torn last line is ignored on load, and compaction rewrites the
+    live records to a new file that atomically replaces the old one.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.size = 0
+        self._file = None
+
+    def load(self):
+        """Read the latest record for every guild."""
+        states = {}
+        try:
+            with open(self.path, "rb") as f:
+                for line in f:
+                    try:
+                        record = _loads(line)
+                    except ValueError:
+                        continue
+                    if record.get("deleted"):
+                        states.pop(record["guild"], None)
+                    else:
+                        states[record["guild"]] = record
+        except FileNotFoundError:
+            pass
+        return states
+
+    def append(self, records):
+        """
+        Append records and make sure they reached the disk.
+
+        Returns:
+            The number of bytes written
+        """
+        if self._file is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._file = open(self.path, "ab")
+            self.size = self._file.tell()
+
+        data = b"".join(_dumps(record) for record in records)
+        self._file.write(data)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.size += len(data)
+        return len(data)
+
+    def compact(self, records):
+        """Replace the journal with only the given records."""
+        self.close()
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp = f"{self.path}.tmp"
+        with open(temp, "wb") as f:
+            f.write(b"".join(_dumps(record) for record in records))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp, self.path)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+class PlayerSnapshots:
+    """
+    Periodically records every player's state so a restarted bot can pick
+    up where it left off.
+
+    Only players whose state changed since their last record are written,
+    and serialization and disk writes happen in a worker thread.
+    """
+    def __init__(self, bot, path=None):
+        self.bot = bot
+        self.journal = SnapshotJournal(path or Config.SNAPSHOT_PATH.format(cluster=bot.cluster_id))
+        self.signatures = {}
+        self.restored = False
+        self._stats = {
+            "writes": 0,
+            "records": 0,
+            "bytes": 0,
+            "write_seconds": 0.0,
+            "last_write_seconds": 0.0,
+            "restored": 0,
+            "restore_total": 0,
+            "restore_seconds": 0.0,
+        }
+        self._live_size = 0
+        self._task = None
+        self._lock = asyncio.Lock()
+
+    def stats(self):
+        """Snapshot write and restore counters."""
+        writes = self._stats["writes"]
+        return dict(
+            self._stats,
+            journal_bytes=self.journal.size,
+            average_write_seconds=self._stats["write_seconds"] / writes if writes else 0.0
+        )
+
+    @staticmethod
+    def capture(player):
+        """Capture a player's state as a snapshot record."""
+        current = player.controller.track
+        pending = []
+        if player.loader is not None:
+            pending = player.loader.tracks[player.loader.loaded:]
+        return {
+            "guild": player.guild.id,
+            "voice_channel": player.channel.id if player.channel else None,
+            "bound_channel": player.bound_channel.id if player.bound_channel else None,
+            "volume": player.volume,
+            "loop": player.loop,
+            "paused": player.is_paused,
+            "position": int(player.position) if current else 0,
+            "current": _entry(current) if current else None,
+            "queue": [_entry(track) for track in player.queue] + [_entry(track) for track in pending],
+            "time": time.time(),
+        }
+
+    @staticmethod
+    def _signature(player):
+        loaded = player.loader.loaded if player.loader is not None else None
+        return (
+            player.queue.version, getattr(player.controller.track, "track_id", None), loaded, player.loop, player.volume,
+            player.is_paused, player.channel and player.channel.id, player.bound_channel and player.bound_channel.id,
+        )
+
+    def _changed(self, player, now):
+        last = self.signatures.get(player.guild.id)
+        if last is None or last[0] != self._signature(player):
+            return True
+
+        _, position, written = last
+        if player.controller.track is None or player.is_paused:
+            return False
+        expected = position + (now - written) * 1000
+        return abs(player.position - expected) > SEEK_TOLERANCE
+
+    def collect(self):
+        """
+        Build records for every player that changed and tombstones for
+        players that are gone.
+        """
+        now = time.time()
+        records = []
+        seen = set()
+        for player in self.bot.node_manager.players:
+            guild_id = player.guild.id
+            seen.add(guild_id)
+            if not self._changed(player, now):
+                continue
+            record = self.capture(player)
+            records.append(record)
+            self.signatures[guild_id] = (self._signature(player), record["position"], now)
+
+        for guild_id in set(self.signatures) - seen:
+            del self.signatures[guild_id]
+            records.append({"guild": guild_id, "deleted": True, "time": now})
+        return records
+
+    async def write(self):
+        """Write a snapshot of the players that changed since the last one."""
+        async with self._lock:
+            records = self.collect()
+            if not records:
+                return 0
+
+            started = time.perf_counter()
+            if self.journal.size > max(Config.SNAPSHOT_COMPACT_BYTES, self._live_size * 4):
+                written = await self._compact()
+            else:
+                written = await asyncio.to_thread(self.journal.append, records)
+            elapsed = time.perf_counter() - started
+
+        SNAPSHOT_WRITE_LATENCY.observe(elapsed)
+        SNAPSHOT_BYTES.inc(written)
+        self._stats["writes"] += 1
+        self._stats["records"] += len(records)
+        self._stats["bytes"] += written
+        self._stats["write_seconds"] += elapsed
+        self._stats["last_write_seconds"] = elapsed
+        logger.debug(f"Wrote {len(records)} player snapshots ({written} bytes) in {elapsed * 1000:.1f}ms")
+        return written
+
+    async def _compact(self):
+        """Rewrite the journal with one record per live player. Must be called with the lock held."""
+        live = [self.capture(player) for player in self.bot.node_manager.players]
+        await asyncio.to_thread(self.journal.compact, live)
+        self._live_size = self.journal.size = os.path.getsize(self.journal.path)
+        return self._live_size
+
+    def start(self):
+        """Start writing snapshots in the background."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._write_loop())
+
+    async def _write_loop(self):
+        while True:
+            await asyncio.sleep(Config.SNAPSHOT_INTERVAL)
+            try:
+                await self.write()
+            except Exception as e:
+                logger.error(f"Error writing player snapshots: {e}")
+
+    async def stop(self):
+        """Stop the background writer and write a final snapshot."""
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        try:
+            await self.write()
+        except Exception as e:
+            logger.error(f"Error writing final player snapshots: {e}")
+        self.journal.close()
+
+    async def restore(self):
+        """
+        Rejoin voice and restore playback for every guild in the last snapshot.
+
+        Players that kept playing on a resumed Lavalink session are
+        reattached as they are, everything else is played again from the
+        saved position.
+
+        Returns:
+            The number of guilds restored
+        """
+        if self.restored:
+            return 0
+        self.restored = True
+
+        started = time.perf_counter()
+        states = await asyncio.to_thread(self.journal.load)
+        results = await asyncio.gather(
+            *(self._restore(state) for state in states.values()),
+            return_exceptions=True
+        )
+
+        restored = 0
+        for state, result in zip(states.values(), results):
+            if isinstance(result, Exception):
+                logger.error(
+                    f"Failed to restore player in guild {state['guild']}: {result}",
+                    extra={"guild": state["guild"]}
+                )
+            elif result:
+                restored += 1
+
+        async with self._lock:
+            await self._compact()
+
+        elapsed = time.perf_counter() - started
+        self._stats["restored"] = restored
+        self._stats["restore_total"] = len(states)
+        self._stats["restore_seconds"] = elapsed
+        if states:
+            logger.info(f"Restored {restored}/{len(states)} players in {elapsed:.2f}s")
+        return restored
+
+    async def _restore(self, state):
+        from core.player import MusicPlayer
+
+        guild = self.bot.get_guild(state["guild"])
+        channel = guild and guild.get_channel(state["voice_channel"] or 0)
+        if channel is None:
+            return False
+
+        resumed = self.bot.node_manager.resumable.get(guild.id)
+        player = self.bot.node_manager.get_player(guild.id)
+        if player is None:
+            await channel.connect(cls=MusicPlayer, self_deaf=True)
+            player = self.bot.node_manager.get_player(guild.id)
+        self.bot.node_manager.resumable.pop(guild.id, None)
+
+        player.bound_channel = guild.get_channel(state["bound_channel"] or 0)
+        player.voice_channel = channel.id
+        player.loop = state["loop"]
+        player.queue.extend(_queued(entry) for entry in state["queue"])
+
+        if resumed is not None and resumed[0] is player.node and resumed[1].get("track"):
+            # The node kept playing through the restart, so only take the player back
+            track = resumed[1]["track"]
+            if state["current"] and state["current"][0] == track["encoded"]:
+                current = _queued(state["current"])
+            else:
+                current = build_track(track["encoded"], track["info"])
+            if current is not None:
+                player.reattach(current, resumed[1])
+                return True
+
+        await player.set_volume(state["volume"])
+        if state["current"]:
+            position = state["position"]
+            if not state["paused"]:
+                position += int((time.time() - state["time"]) * 1000)
+            current = _queued(state["current"])
+            if position >= current.length > 0:
+                # The track would have finished while the bot was down
+                position = 0
+            else:
+                player.queue.insert(0, current)
+            await player.controller.start(start=position)
+        if state["paused"]:
+            await player.set_pause(True)
+        return True
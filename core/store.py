@@ -0,0 +1,236 @@
+import os
+import json
+import time
+import asyncio
+import logging
+import sqlite3
+import threading
+import pomice
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tracks (
+    id INTEGER PRIMARY KEY,
+    encoded TEXT NOT NULL,
+    source TEXT NOT NULL,
+    identifier TEXT NOT NULL,
+    uri TEXT,
+    isrc TEXT,
+    info TEXT NOT NULL,
+    plays INTEGER NOT NULL DEFAULT 0,
+    last_used REAL NOT NULL,
+    UNIQUE (source, identifier)
+);
+CREATE INDEX IF NOT EXISTS tracks_uri ON tracks (uri);
+CREATE INDEX IF NOT EXISTS tracks_identifier ON tracks (identifier);
+CREATE INDEX IF NOT EXISTS tracks_isrc ON tracks (isrc);
+CREATE INDEX IF NOT EXISTS tracks_last_used ON tracks (last_used);
+CREATE INDEX IF NOT EXISTS tracks_plays ON tracks (plays);
+CREATE TABLE IF NOT EXISTS lookups (
+    query TEXT PRIMARY KEY,
+    track INTEGER NOT NULL REFERENCES tracks (id) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS lookups_track ON lookups (track);
+"""
+
+def build_track(encoded, info):
+    """
+    Rebuild a pomice track from its encoded form and info.
+
+    Returns:
+        The track, or None if its source is not one pomice knows
+    """
+    try:
+        track_type = pomice.TrackType(info.get("sourceName"))
+    except ValueError:
+        return None
+    return pomice.Track(track_id=encoded, info=info, track_type=track_type)
+
+class TrackStore:
+    """
+    SQLite store of resolved tracks, so repeat plays of a URL skip Lavalink.
+
+    The database runs in WAL mode and every query runs in a worker thread.
+    The store keeps at most max_entries tracks and evicts the least
+    recently used ones first.
+    """
+    def __init__(self, path=None, *, max_entries=None):
+        self.path = path or Config.TRACK_STORE_PATH
+        self.max_entries = max_entries or Config.TRACK_STORE_MAX_ENTRIES
+        self.hits = 0
+        self.misses = 0
+        self._db = None
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._tasks = set()
+
+    @property
+    def is_open(self):
+        return self._db is not None
+
+    async def open(self):
+        """Open the database, creating it if needed."""
+        await asyncio.to_thread(self._open)
+        logger.info(f"Opened track store {self.path}")
+
+    def _open(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        db = sqlite3.connect(self.path, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.execute("PRAGMA foreign_keys=ON")
+        db.executescript(SCHEMA)
+        self._db = db
+
+    async def _run(self, function, *args):
+        def call():
+            with self._lock:
+                return function(*args)
+        return await asyncio.to_thread(call)
+
+    async def lookup(self, query):
+        """
+        Get the track previously resolved for a URL.
+
+        Args:
+            query: The URL that was resolved
+
+        Returns:
+            A list with the rebuilt track, or None if it is not stored
+        """
+        row = await self._run(self._lookup, query)
+        track = build_track(row[0], json.loads(row[1])) if row else None
+        if track is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return [track]
+
+    def _lookup(self, query):
+        row = self._db.execute(
+            "SELECT t.id, t.encoded, t.info FROM lookups l JOIN tracks t ON t.id = l.track WHERE l.query = ?",
+            (query,)
+        ).fetchone()
+        if row is None:
+            row = self._db.execute("SELECT id, encoded, info FROM tracks WHERE uri = ?", (query,)).fetchone()
+        if row is None:
+            return None
+
+        with self._db:
+            self._db.execute(
+                "UPDATE tracks SET plays = plays + 1, last_used = ? WHERE id = ?",
+                (time.time(), row[0])
+            )
+        return row[1:]
+
+    async def find(self, *, identifier=None, isrc=None):
+        """
+        Find a stored track by identifier or ISRC.
+
+        Returns:
+            The rebuilt track, or None
+        """
+        if identifier is not None:
+            sql, value = "SELECT encoded, info FROM tracks WHERE identifier = ? LIMIT 1", identifier
+        else:
+            sql, value = "SELECT encoded, info FROM tracks WHERE isrc = ? LIMIT 1", isrc
+        row = await self._run(lambda: self._db.execute(sql, (value,)).fetchone())
+        return build_track(row[0], json.loads(row[1])) if row else None
+
+    def save(self, query, track):
+        """
+        Store a resolved track in the background.
+
+        Args:
+            query: The URL that resolved to the track
+            track: The pomice track
+        """
+        info = dict(track.info)
+        row = (
+            track.track_id,
+            info.get("sourceName") or "unknown",
+            info.get("identifier") or track.track_id,
+            info.get("uri"),
+            info.get("isrc"),
+            json.dumps(info),
+            time.time(),
+        )
+        task = asyncio.create_task(self._run(self._save, query, row))
+        self._tasks.add(task)
+        task.add_done_callback(self._task_done)
+        return task
+
+    def _save(self, query, row):
+        with self._db:
+            self._db.execute(
+                "INSERT INTO tracks (encoded, source, identifier, uri, isrc, info, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (source, identifier) DO UPDATE SET "
+                "encoded = excluded.encoded, uri = excluded.uri, isrc = excluded.isrc, "
+                "info = excluded.info, last_used = excluded.last_used",
+                row
+            )
+            track_id = self._db.execute(
+                "SELECT id FROM tracks WHERE source = ? AND identifier = ?", row[1:3]
+            ).fetchone()[0]
+            self._db.execute("INSERT OR REPLACE INTO lookups (query, track) VALUES (?, ?)", (query, track_id))
+
+        self._writes += 1
+        if self._writes % 100 == 0:
+            self._evict()
+
+    def _evict(self):
+        count = self._db.execute("SELECT COUNT(*) FROM tracks").fetchone()[0]
+        excess = count - self.max_entries
+        if excess <= 0:
+            return
+        with self._db:
+            self._db.execute(
+                "DELETE FROM tracks WHERE id IN (SELECT id FROM tracks ORDER BY last_used LIMIT ?)",
+                (excess,)
+            )
+        logger.info(f"Evicted {excess} tracks from the track store")
+
+    def _task_done(self, task):
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception():
+            logger.error(f"Error saving track: {task.exception()}")
+
+    async def hottest(self, count):
+        """
+        Get the most played stored tracks with the URLs that resolve to them.
+
+        Args:
+            count: Maximum number of tracks
+
+        Returns:
+            A list of (query, track) pairs
+        """
+        rows = await self._run(lambda: self._db.execute(
+            "SELECT l.query, t.encoded, t.info FROM tracks t JOIN lookups l ON l.track = t.id "
+            "ORDER BY t.plays DESC LIMIT ?",
+            (count,)
+        ).fetchall())
+        pairs = []
+        for query, encoded, info in rows:
+            track = build_track(encoded, json.loads(info))
+            if track is not None:
+                pairs.append((query, track))
+        return pairs
+
+    async def count(self):
+        """Get the number of stored tracks."""
+        return await self._run(lambda: self._db.execute("SELECT COUNT(*) FROM tracks").fetchone()[0])
+
+    async def close(self):
+        """Finish pending writes and close the database."""
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._db is not None:
+            await self._run(self._db.close)
+            self._db = None
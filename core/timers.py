@@ -0,0 +1,91 @@
+import time
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+class TimerHandle:
+    """A callback scheduled on a TimerWheel."""
+    __slots__ = ("callback", "args", "rounds", "slot", "cancelled")
+
+    def __init__(self, callback, args, rounds, slot):
+        self.callback = callback
+        self.args = args
+        self.rounds = rounds
+        self.slot = slot
+        self.cancelled = False
+
+    def cancel(self):
+        """Stop the callback from running."""
+        if not self.cancelled:
+            self.cancelled = True
+            self.slot.discard(self)
+
+class TimerWheel:
+    """
+    Coarse hashed timing wheel shared by every guild.
+
+    A single task advances the wheel once per tick and runs the callbacks
+    that are due, so thousands of timers cost one sleeping task instead of
+    one task each. Callbacks are plain functions and should not block;
+    anything slow should be handed off to a task.
+    """
+    def __init__(self, tick=1.0, slots=64):
+        self.tick = tick
+        self._slots = [set() for _ in range(slots)]
+        self._cursor = 0
+        self._task = None
+
+    def __len__(self):
+        return sum(len(slot) for slot in self._slots)
+
+    def schedule(self, delay, callback, *args):
+        """
+        Run a callback after a delay, rounded up to the wheel's tick.
+
+        Args:
+            delay: Seconds to wait
+            callback: The function to call
+            *args: Arguments for the callback
+
+        Returns:
+            A TimerHandle that can cancel the callback
+        """
+        ticks = max(1, int(-(-delay // self.tick)))
+        rounds, offset = divmod(ticks - 1, len(self._slots))
+        slot = self._slots[(self._cursor + 1 + offset) % len(self._slots)]
+        handle = TimerHandle(callback, args, rounds, slot)
+        slot.add(handle)
+        return handle
+
+    def start(self):
+        """Start advancing the wheel."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        """Stop advancing the wheel."""
+        if self._task:
+            self._task.cancel()
+
+    async def _run(self):
+        next_tick = time.monotonic()
+        while True:
+            next_tick += self.tick
+            await asyncio.sleep(max(0, next_tick - time.monotonic()))
+            self._advance()
+
+    def _advance(self):
+        self._cursor = (self._cursor + 1) % len(self._slots)
+        slot = self._slots[self._cursor]
+        for handle in list(slot):
+            if handle.rounds:
+                handle.rounds -= 1
+                continue
+
+            slot.discard(handle)
+            handle.cancelled = True
+            try:
+                handle.callback(*handle.args)
+            except Exception as e:
+                logger.error(f"Error in timer callback {handle.callback!r}: {e}")
@@ -0,0 +1,89 @@
+import sys
+import pomice
+
+from core import codec
+
+class QueuedTrack:
+    """
+    Compact queue entry for a track that has not been played yet.
+
+    Holds the encoded track with just the fields the queue displays, and
+    the requester's ID instead of their Member. Everything else is decoded
+    from the encoded track the first time it is needed, and a full pomice
+    Track is only built when the track is played.
+
+    Entries compare by identity, so the same song queued twice is two
+    separate entries. needs_filter is set while a requested title filter
+    has not been applied yet.
+    """
+    __slots__ = ("encoded", "title", "author", "length", "track_type", "requester_id", "needs_filter", "_info")
+
+    def __init__(self, encoded, title, author, length, track_type, requester_id=None):
+        self.encoded = encoded
+        self.title = title
+        self.author = sys.intern(author or "")
+        self.length = length
+        self.track_type = track_type
+        self.requester_id = requester_id
+        self.needs_filter = False
+        self._info = None
+
+    @classmethod
+    def from_track(cls, track, requester=None):
+        """
+        Build a queue entry from a pomice track.
+
+        Args:
+            track: The track, or an existing QueuedTrack
+            requester: The member who queued it, defaults to track.requester
+        """
+        if isinstance(track, cls):
+            if requester is not None:
+                track.requester_id = requester.id
+            return track
+
+        requester = requester or getattr(track, "requester", None)
+        return cls(
+            track.track_id,
+            track.title,
+            track.author,
+            track.length,
+            track.track_type,
+            requester.id if requester is not None else None
+        )
+
+    @property
+    def track_id(self):
+        return self.encoded
+
+    @property
+    def source(self):
+        return self.track_type.value
+
+    def _decoded(self):
+        if self._info is None:
+            self._info = codec.decode(self.encoded)
+        return self._info
+
+    @property
+    def info(self):
+        """The full track info, decoded from the encoded track."""
+        return dict(self._decoded(), title=self.title)
+
+    @property
+    def uri(self):
+        return self._decoded()["uri"]
+
+    def to_track(self, guild=None):
+        """
+        Build the pomice track to play.
+
+        Args:
+            guild: Used to look up the requester
+        """
+        track = pomice.Track(track_id=self.encoded, info=self.info, track_type=self.track_type)
+        track.requester = guild.get_member(self.requester_id) if guild and self.requester_id else None
+        return track
+
+    def __repr__(self):
+        return f"<QueuedTrack title={self.title!r} requester_id={self.requester_id}>"
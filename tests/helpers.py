@@ -0,0 +1,76 @@
+"""
+Shared setup for tests that run against the fake Lavalink node.
+"""
+import os
+import socket
+import asyncio
+import contextlib
+
+# Keep the bot local before config is imported
+os.environ["METRICS_PORT"] = "0"
+os.environ["TRACK_STORE_PATH"] = ""
+os.environ["SNAPSHOT_PATH"] = ""
+
+from aiohttp import web
+
+from benchmarks.fake_discord import FakeGuild, FakeUser
+from benchmarks.fake_lavalink import FakeLavalink
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+@contextlib.asynccontextmanager
+async def fake_node(**kwargs):
+    """Serve a FakeLavalink in this process and yield it with its port."""
+    node = FakeLavalink(**kwargs)
+    runner = web.AppRunner(node.app(), shutdown_timeout=1)
+    await runner.setup()
+    port = free_port()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+    try:
+        yield node, port
+    finally:
+        await runner.cleanup()
+
+@contextlib.asynccontextmanager
+async def music_bot(port, session_path=""):
+    """Yield a MusicBot connected to the fake node at port, with no gateway session."""
+    from core.bot import MusicBot
+    from core.metadata import MetadataFilter
+    from core.nodes import NodeManager
+
+    bot = MusicBot(shard_count=1)
+    bot._connection.user = FakeUser("TestBot", bot=True)
+    bot.node_manager = NodeManager(bot, nodes=[{
+        "host": "127.0.0.1",
+        "port": port,
+        "password": "youshallnotpass",
+        "identifier": "FAKE",
+    }], session_path=session_path)
+    bot.metadata_filter = MetadataFilter(url=f"http://127.0.0.1:{port}/filter")
+
+    await bot.__aenter__()
+    try:
+        bot._ready.set()
+        if not await bot.node_manager.connect():
+            raise RuntimeError("Could not connect to the fake Lavalink node")
+        yield bot
+    finally:
+        await bot.close()
+
+async def connect_player(bot, guild=None):
+    """Join a fake guild's voice channel and return the guild and its player."""
+    from core.player import MusicPlayer
+
+    guild = guild or FakeGuild(bot, 0)
+    player = await guild.voice_channel.connect(cls=MusicPlayer, self_deaf=True)
+    return guild, player
+
+async def wait_for(predicate, timeout=5):
+    """Poll until predicate() is true."""
+    async def poll():
+        while not predicate():
+            await asyncio.sleep(0.02)
+    await asyncio.wait_for(poll(), timeout)
@@ -0,0 +1,28 @@
+import time
+import signal
+import multiprocessing
+
+from core.cluster import stop_clusters
+
+def sleep_forever(ignore_sigterm):
+    if ignore_sigterm:
+        signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    while True:
+        time.sleep(1)
+
+def test_stop_clusters_terminates_and_kills_stragglers():
+    processes = {
+        0: multiprocessing.Process(target=sleep_forever, args=(False,)),
+        1: multiprocessing.Process(target=sleep_forever, args=(True,)),
+    }
+    for process in processes.values():
+        process.start()
+    # Give the second process time to install its handler
+    time.sleep(0.5)
+
+    started = time.monotonic()
+    stop_clusters(processes, timeout=1)
+
+    assert time.monotonic() - started < 5
+    assert processes[0].exitcode == -signal.SIGTERM
+    assert processes[1].exitcode == -signal.SIGKILL
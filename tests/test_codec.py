@@ -0,0 +1,16 @@
+import pytest
+
+from core import codec
+
+ENCODED = codec.encode({
+    "identifier": "abc", "isSeekable": True, "author": "Artist", "length": 1000, "isStream": False,
+    "position": 0, "title": "Title", "uri": None, "artworkUrl": None, "isrc": None, "sourceName": "youtube",
+})
+
+def test_decode_many_rejects_what_decode_rejects():
+    # Without validation, characters outside the base64 alphabet are silently dropped
+    corrupted = ENCODED[:8] + "!" + ENCODED[8:]
+
+    with pytest.raises(codec.TrackDecodeError):
+        codec.decode(corrupted)
+    assert codec.decode_many([ENCODED, corrupted]) == [codec.decode(ENCODED), None]
@@ -0,0 +1,31 @@
+import asyncio
+
+from benchmarks.fake_lavalink import make_track
+from core.store import build_track
+from tests.helpers import fake_node, music_bot, connect_player, wait_for
+
+def tracks(name, count):
+    return [build_track(track["encoded"], track["info"]) for track in (
+        make_track(f"{name}-{i}", f"{name} {i} (Official Video)") for i in range(count)
+    )]
+
+def test_lookahead_only_filters_titles_once_and_when_asked():
+    async def run():
+        async with fake_node() as (lavalink, port), music_bot(port) as bot:
+            _, player = await connect_player(bot)
+            player.lookahead.depth = 3
+
+            await player.insert_many(tracks("unfiltered", 2), filter=False)
+            await wait_for(lambda: len(player.lookahead.prepared) == 2)
+            assert lavalink.filters == 0
+            assert player.queue[0].title == "unfiltered 0 (Official Video)"
+
+            await player.insert(tracks("filtered", 1)[0])
+            await wait_for(lambda: len(player.lookahead.prepared) == 3)
+            # The lookahead shares or reuses the insert's lookup
+            assert lavalink.filters == 1
+            assert player.queue[2].title == "filtered 0"
+            assert player.lookahead.take(player.queue[2]) is not None
+            await player.teardown()
+
+    asyncio.run(run())
@@ -0,0 +1,33 @@
+import asyncio
+
+from aiohttp import web
+
+from core.metadata import MetadataFilter
+from tests.helpers import free_port
+
+def test_failed_lookups_are_not_cached():
+    statuses = [429, 200]
+
+    async def filter_title(request):
+        status = statuses.pop(0)
+        if status != 200:
+            return web.Response(status=status)
+        return web.json_response({"status": "success", "data": {"track": "Title"}})
+
+    async def run():
+        app = web.Application()
+        app.router.add_get("/filter", filter_title)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        port = free_port()
+        await web.TCPSite(runner, "127.0.0.1", port).start()
+        metadata = MetadataFilter(url=f"http://127.0.0.1:{port}/filter")
+        try:
+            assert await metadata.clean("Title (Official Video)") == "Title (Official Video)"
+            assert metadata.cache.get("Title (Official Video)") is None
+            assert await metadata.clean("Title (Official Video)") == "Title"
+        finally:
+            await metadata.close()
+            await runner.cleanup()
+
+    asyncio.run(run())
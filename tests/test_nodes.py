@@ -0,0 +1,134 @@
+import asyncio
+from types import SimpleNamespace
+
+from core.nodes import NodeManager, node_penalty, select_node
+from tests.helpers import fake_node, music_bot, connect_player
+
+class StandInNode:
+    """The parts of pomice.Node that NodeManager uses, recording REST calls."""
+
+    def __init__(self, identifier="A", *, connected=True, players=None, stats=None, session_id="session-1", remote_players=()):
+        self._identifier = identifier
+        self.is_connected = connected
+        self.players = players or {}
+        self.stats = stats
+        self._session_id = session_id
+        self._headers = {}
+        self.remote_players = list(remote_players)
+        self.requests = []
+
+    def get_player(self, guild_id):
+        return self.players.get(guild_id)
+
+    async def send(self, method, path, data=None, **kwargs):
+        self.requests.append((method, path, data))
+        if method == "GET" and path.endswith("/players"):
+            return [{"guildId": str(guild_id)} for guild_id in self.remote_players]
+        return {}
+
+class StandInPlayer:
+    def __init__(self):
+        self.endpoint = None
+        self.started = 0
+        self.controller = SimpleNamespace(start=self._start)
+
+    async def _refresh_endpoint_uri(self, session_id):
+        self.endpoint = f"sessions/{session_id}/players"
+
+    async def _start(self):
+        self.started += 1
+
+def manager(*nodes):
+    nodes_manager = NodeManager(SimpleNamespace(cluster_id=0), nodes=[{}], session_path="")
+    nodes_manager.resume_timeout = 60
+    for node in nodes:
+        nodes_manager.nodes[node._identifier] = node
+        nodes_manager.sessions[node._identifier] = node._session_id
+    return nodes_manager
+
+def stats(players=0, system_load=0.0, cores=4, deficit=0, nulled=0):
+    return SimpleNamespace(
+        players_active=players, cpu_cores=cores, cpu_system_load=system_load,
+        frames_deficit=deficit, frames_nulled=nulled,
+    )
+
+def test_penalty_grows_with_load():
+    idle = StandInNode(stats=stats())
+    busy = StandInNode(stats=stats(players=10))
+    loaded = StandInNode(stats=stats(system_load=0.9))
+    dropping = StandInNode(stats=stats(deficit=300))
+
+    assert node_penalty(idle) == 0
+    assert node_penalty(busy) == 10
+    assert node_penalty(loaded) > node_penalty(idle)
+    assert node_penalty(dropping) > node_penalty(idle)
+
+def test_select_node_picks_lowest_penalty():
+    quiet = StandInNode("quiet", stats=stats(players=2))
+    busy = StandInNode("busy", stats=stats(players=5))
+    lagging = StandInNode("lagging", stats=stats(players=1, nulled=600))
+
+    assert select_node([busy, quiet, lagging]) is quiet
+
+def test_select_node_skips_disconnected_nodes():
+    down = StandInNode("down", connected=False, stats=stats())
+    up = StandInNode("up", stats=stats(players=20))
+
+    assert select_node([down, up]) is up
+    assert select_node([down]) is None
+
+def test_select_node_respects_max_players():
+    full = StandInNode("full", players={i: object() for i in range(3)}, stats=stats(players=3))
+    loaded = StandInNode("loaded", players={0: object()}, stats=stats(players=1, system_load=0.9))
+
+    assert select_node([full, loaded]) is full
+    assert select_node([full, loaded], max_players=3) is loaded
+    assert select_node([full], max_players=3) is None
+
+def test_new_session_enables_resuming():
+    node = StandInNode()
+    nodes = manager(node)
+    node._headers["Session-Id"] = "session-1"
+    # pomice reconnected between two checks and got a new session
+    node._session_id = "session-2"
+
+    asyncio.run(nodes.check_nodes())
+
+    assert ("PATCH", "sessions/session-2", {"resuming": True, "timeout": 60}) in node.requests
+    assert node._headers["Session-Id"] == "session-2"
+    assert nodes.sessions["A"] == "session-2"
+
+def test_resumed_session_keeps_players_and_releases_moved_ones():
+    player = StandInPlayer()
+    node = StandInNode(players={1: player}, remote_players=[1, 2])
+    nodes = manager(node)
+
+    async def outage():
+        node.is_connected = False
+        await nodes.check_nodes()
+        assert "A" in nodes.failed and node._session_id is None
+
+        node.is_connected = True
+        node._session_id = "session-1"
+        await nodes.check_nodes()
+
+    asyncio.run(outage())
+
+    assert "A" not in nodes.failed
+    assert player.endpoint == "sessions/session-1/players"
+    assert player.started == 1
+    assert ("DELETE", "sessions/session-1/players/2", None) in node.requests
+    assert not any(method == "PATCH" for method, _, _ in node.requests)
+
+def test_close_closes_connections_and_leaves_players():
+    async def run():
+        async with fake_node() as (lavalink, port):
+            async with music_bot(port) as bot:
+                node = bot.node_manager.nodes["FAKE"]
+                guild, _ = await connect_player(bot)
+            assert not node.is_connected
+            assert node._session.closed
+            # Kept by Lavalink for the next process to resume
+            assert str(guild.id) in lavalink.players
+
+    asyncio.run(run())
@@ -0,0 +1,56 @@
+import random
+from collections import deque
+
+from core.queue import TrackQueue
+
+def test_queue_matches_a_deque():
+    rng = random.Random(1)
+    reference = deque()
+    queue = TrackQueue()
+    for step in range(20000):
+        op = rng.random()
+        if op < 0.4:
+            track = object()
+            reference.append(track)
+            queue.put_nowait(track)
+        elif op < 0.7 and reference:
+            assert queue.get_nowait() is reference.popleft()
+        elif op < 0.8:
+            index = rng.randint(-len(reference) - 2, len(reference) + 2)
+            track = object()
+            reference.insert(index, track)
+            queue.insert(index, track)
+        elif op < 0.87 and reference:
+            index = rng.randint(-len(reference), len(reference) - 1)
+            track = reference[index]
+            del reference[index]
+            assert queue.remove(index) is track
+        elif op < 0.95 and reference:
+            source = rng.randrange(len(reference))
+            destination = rng.randrange(len(reference))
+            track = reference[source]
+            del reference[source]
+            reference.insert(destination, track)
+            assert queue.move(source, destination) is track
+        elif op < 0.96:
+            queue.shuffle()
+            reference = deque(queue)
+
+        assert len(queue) == len(reference)
+        if step % 50 == 0:
+            tracks = list(reference)
+            assert list(queue) == tracks
+            start = rng.randint(0, len(tracks) + 2)
+            assert queue.page(start, 10) == tracks[start:start + 10]
+            assert queue[2:9:3] == tracks[2:9:3]
+            if tracks:
+                track = rng.choice(tracks)
+                assert queue.index(track) == tracks.index(track)
+                assert queue[-1] is tracks[-1]
+
+def test_dequeued_slots_are_released():
+    queue = TrackQueue(range(1000))
+    for _ in range(600):
+        queue.get_nowait()
+    assert len(queue._tracks) < 1000
+    assert queue.page(0, 3) == [600, 601, 602]
@@ -0,0 +1,31 @@
+import asyncio
+
+from benchmarks.fake_discord import FakeGuild
+from benchmarks.fake_lavalink import make_track
+from core.store import build_track
+from tests.helpers import fake_node, music_bot, connect_player, wait_for
+
+def test_reattached_player_advances_its_queue():
+    async def run():
+        async with fake_node(track_seconds=1.0) as (lavalink, port), music_bot(port) as bot:
+            node = bot.node_manager.nodes["FAKE"]
+            a = make_track("resumed-a", "Track A")
+            b = make_track("resumed-b", "Track B")
+
+            # The node starts A before this process has a player for the guild,
+            # as it would for a session resumed from the previous process.
+            guild = FakeGuild(bot, 0)
+            guild_id = guild.id
+            await node.send(method="PATCH", path=f"sessions/{node._session_id}/players/{guild_id}", data={"encodedTrack": a["encoded"]})
+            data = await node.send(method="GET", path=f"sessions/{node._session_id}/players/{guild_id}")
+
+            _, player = await connect_player(bot, guild)
+            player.reattach(build_track(a["encoded"], a["info"]), data)
+            await player.insert(build_track(b["encoded"], b["info"]), filter=False)
+
+            await wait_for(lambda: player.controller.track is not None and player.controller.track.title == "Track B")
+            assert len(player.queue) == 0
+            assert lavalink.players[str(guild_id)]["track"]["encoded"] == b["encoded"]
+            await player.teardown()
+
+    asyncio.run(run())
@@ -0,0 +1,83 @@
+import time
+from collections import OrderedDict
+
+class TTLCache:
+    """
+    Least-recently-used mapping whose entries expire after a fixed time.
+
+    When a weigher is given, the cache is also bounded by the total weight
+    of its values (for example, their approximate size in bytes).
+    """
+    def __init__(self, maxsize=1024, ttl=300, *, max_weight=None, weigher=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_weight = max_weight
+        self.weigher = weigher
+        self.weight = 0
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        entry = self._data.get(key)
+        return entry is not None and entry[0] >= time.monotonic()
+
+    def get(self, key, default=None):
+        """
+        Get a cached value.
+
+        Args:
+            key: The cache key
+            default: Value returned when the key is missing or expired
+
+        Returns:
+            The cached value or the default
+        """
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+
+        expires, value, _ = entry
+        if expires < time.monotonic():
+            self._discard(key)
+            self.misses += 1
+            return default
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key, value):
+        """Store a value, evicting the least recently used entries if the cache is full."""
+        self._discard(key)
+        weight = self.weigher(value) if self.weigher else 0
+        if self.max_weight is not None and weight > self.max_weight:
+            return
+
+        self._data[key] = (time.monotonic() + self.ttl, value, weight)
+        self.weight += weight
+        while len(self._data) > self.maxsize or (
+            self.max_weight is not None and self.weight > self.max_weight
+        ):
+            _, (_, _, evicted) = self._data.popitem(last=False)
+            self.weight -= evicted
+
+    def _discard(self, key):
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self.weight -= entry[2]
+        return entry
+
+    def pop(self, key, default=None):
+        """Remove a key and return its value."""
+        entry = self._discard(key)
+        return default if entry is None else entry[1]
+
+    def clear(self):
+        """Remove every entry."""
+        self._data.clear()
+        self.weight = 0
@@ -1,5 +1,7 @@
 import discord
 
+from utils.helpers import format_time, progress_bar
+
 def base_embed(title=None, description=None):
     """Create a base embed with consistent styling."""
     embed = discord.Embed(
@@ -36,8 +38,8 @@ def music_embed(title=None, description=None):
     )
     return embed
 
-def now_playing_embed(track, requester):
-    """Create an embed for the now playing message."""
+def now_playing_embed(track, requester, position=None, paused=False):
+    """Create an embed for the now playing message, with a progress bar if a position is given."""
     duration_ms = track.info.get('length', 0)
     duration_sec = duration_ms // 1000
     minutes = duration_sec // 60
@@ -52,6 +54,15 @@ def now_playing_embed(track, requester):
         embed.add_field(name="Artist", value=track.info.get('author'), inline=True)
     embed.add_field(name="Duration", value=f"{minutes}:{seconds:02d}", inline=True)
     
+    if position is not None:
+        position = min(position, duration_ms)
+        status = "⏸️" if paused else "▶️"
+        embed.add_field(
+            name="Progress",
+            value=f"{status} {progress_bar(position, duration_ms)} `{format_time(position / 1000)} / {format_time(duration_sec)}`",
+            inline=False
+        )
+    
     embed.set_footer(
         text=f"Requested by: {requester.name}",
         icon_url=requester.avatar.url if requester.avatar else None
@@ -64,13 +75,12 @@ def now_playing_embed(track, requester):
 
 def queue_embed(player, current_track=None, page=1, items_per_page=10):
     """Create an embed for the queue."""
-    queue_items = player.queue_list
-    total_pages = (len(queue_items) + items_per_page - 1) // items_per_page
+    queue_length = len(player.queue)
+    total_pages = (queue_length + items_per_page - 1) // items_per_page
     
     page = max(1, min(page, total_pages or 1))
     
     start_idx = (page - 1) * items_per_page
-    end_idx = min(start_idx + items_per_page, len(queue_items))
     
     embed = discord.Embed(
         title="Music Queue",
@@ -83,11 +93,11 @@ def queue_embed(player, current_track=None, page=1, items_per_page=10):
             value=f"[{current_track.title}]({current_track.uri})",
             inline=False
         )
-    if not queue_items:
+    if not queue_length:
         embed.description = "The queue is currently empty."
     else:
         queue_list = []
-        for i, track in enumerate(queue_items[start_idx:end_idx], start=start_idx + 1):
+        for i, track in enumerate(player.queue.page(start_idx, items_per_page), start=start_idx + 1):
             queue_list.append(f"{i}. [{track.title}]({track.uri})")
         
         embed.description = "\n".join(queue_list)
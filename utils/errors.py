@@ -1,9 +1,9 @@
 import discord
-import traceback
 import logging
 from discord.ext import commands
 
 from utils.embeds import error_embed
+from utils.metrics import COMMAND_ERRORS, observe_command
 
 logger = logging.getLogger(__name__)
 
@@ -13,6 +13,9 @@ async def setup_error_handlers(bot):
     @bot.event
     async def on_command_error(ctx, error):
         """Handle command errors."""
+        observe_command(ctx)
+        COMMAND_ERRORS.inc(type=type(error).__name__)
+        
         if hasattr(ctx.command, 'on_error'):
             return  
             
@@ -67,8 +70,11 @@ async def setup_error_handlers(bot):
             )
             return
             
-        logger.error(f"Unhandled error in command {ctx.command}: {error}")
-        logger.error(traceback.format_exc())
+        logger.error(
+            f"Unhandled error in command {ctx.command}: {error}",
+            exc_info=error,
+            extra={"guild": ctx.guild.id if ctx.guild else None, "command": str(ctx.command)}
+        )
         
         await ctx.send(
             embed=error_embed(
@@ -79,4 +85,4 @@ async def setup_error_handlers(bot):
     @bot.event
     async def on_error(event, *args, **kwargs):
         """Handle generic errors."""
-        logger.error(f"Error in event {event}: {traceback.format_exc()}")
+        logger.error(f"Error in event {event}", exc_info=True, extra={"event": event})
@@ -1,6 +1,15 @@
 import re
 import time
 import discord
+import psutil
+
+URL_REGEX = re.compile(
+    r'^(?:http|https)://'  
+    r'(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+(?:[A-Z]{2,6}\.?|[A-Z0-9-]{2,}\.?)|'  
+    r'localhost|' 
+    r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})' 
+    r'(?::\d+)?' 
+    r'(?:/?|[/?]\S+)$', re.IGNORECASE)
 
 def format_time(seconds):
     """
@@ -20,6 +29,23 @@ def format_time(seconds):
     else:
         return f"{minutes}:{seconds:02d}"
 
+def progress_bar(position, length, width=15):
+    """
+    Build a text progress bar.
+    
+    Args:
+        position: Current position
+        length: Total length
+        width: Number of characters in the bar
+        
+    Returns:
+        Progress bar string
+    """
+    if length <= 0:
+        return "▬" * width
+    filled = min(width - 1, int(position / length * width))
+    return "▬" * filled + "🔘" + "▬" * (width - filled - 1)
+
 def format_uptime(start_time):
     """
     Format uptime from a start timestamp.
@@ -47,6 +73,31 @@ def format_uptime(start_time):
     
     return ", ".join(parts)
 
+def get_memory_usage():
+    """
+    Get the resident set size of the current process.
+    
+    Returns:
+        Memory usage in bytes
+    """
+    return psutil.Process().memory_info().rss
+
+def format_bytes(size):
+    """
+    Format a byte count into a human readable string.
+    
+    Args:
+        size: Size in bytes
+        
+    Returns:
+        Formatted size string
+    """
+    for unit in ("B", "KiB", "MiB"):
+        if abs(size) < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
+
 def is_url(string):
     """
     Check if a string is a URL.
@@ -57,15 +108,7 @@ def is_url(string):
     Returns:
         True if the string is a URL, False otherwise
     """
-    url_regex = re.compile(
-        r'^(?:http|https)://'  
-        r'(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+(?:[A-Z]{2,6}\.?|[A-Z0-9-]{2,}\.?)|'  
-        r'localhost|' 
-        r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})' 
-        r'(?::\d+)?' 
-        r'(?:/?|[/?]\S+)$', re.IGNORECASE)
-    
-    return bool(url_regex.match(string))
+    return bool(URL_REGEX.match(string))
 
 async def ensure_voice(ctx):
     """
@@ -1,28 +1,173 @@
 import os
+import copy
+import json
+import queue
+import atexit
+import random
 import logging
-from logging.handlers import RotatingFileHandler
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
 
-def setup_logger(name, level=logging.INFO):
-    """Set up a logger with file and console handlers."""
-    logger = logging.getLogger(name)
-    logger.setLevel(level)
-    if logger.hasHandlers():
-        return logger
-    
-    formatter = logging.Formatter(
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from config import Config
+
+# Extra record attributes copied into structured log lines
+STRUCTURED_FIELDS = ("guild", "command", "node", "event")
+
+_listener = None
+_handler = None
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line."""
+
+    def format(self, record):
+        data = {
+            "time": self.formatTime(record, self.datefmt),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for field in STRUCTURED_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                data[field] = value
+        if record.exc_info:
+            data["exception"] = self.formatException(record.exc_info)
+
+        if orjson is not None:
+            return orjson.dumps(data, default=str).decode()
+        return json.dumps(data, default=str)
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep only a fraction of noisy records below ERROR.
+
+    Rates are matched against the record's `event` extra first, then
+    against the logger name and its parents.
+    """
+    def __init__(self, rates):
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record):
+        if not self.rates or record.levelno >= logging.ERROR:
+            return True
+
+        rate = self.rates.get(getattr(record, "event", None))
+        name = record.name
+        while rate is None and name:
+            rate = self.rates.get(name)
+            name = name.rpartition(".")[0]
+
+        return rate is None or random.random() < rate
+
+class DroppingQueueHandler(QueueHandler):
+    """
+    Hand records to the background writer without blocking.
+
+    Records are dropped, and counted, when the buffer is full.
+    """
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Formatting (including tracebacks) happens on the writer thread;
+        # only merge the arguments so mutable objects are captured now.
+        record = copy.copy(record)
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+class ModuleFileHandler(logging.Handler):
+    """Write each module's records to its own rotating file under logs/."""
+
+    def __init__(self, directory="logs"):
+        super().__init__()
+        self.directory = directory
+        self.handlers = {}
+        os.makedirs(directory, exist_ok=True)
+
+    def _handler_for(self, name):
+        filename = name.split(".")[-1]
+        handler = self.handlers.get(filename)
+        if handler is None:
+            handler = RotatingFileHandler(
+                os.path.join(self.directory, f"{filename}.log"),
+                maxBytes=5*1024*1024,
+                backupCount=5
+            )
+            handler.setFormatter(self.formatter)
+            self.handlers[filename] = handler
+        return handler
+
+    def emit(self, record):
+        self._handler_for(record.name).handle(record)
+
+    def close(self):
+        for handler in self.handlers.values():
+            handler.close()
+        super().close()
+
+def _build_formatter():
+    if Config.LOG_FORMAT == "json":
+        return JsonFormatter(datefmt='%Y-%m-%dT%H:%M:%S')
+    return logging.Formatter(
         '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
         datefmt='%Y-%m-%d %H:%M:%S'
-    )  
-    os.makedirs('logs', exist_ok=True)
-    file_handler = RotatingFileHandler(
-        f'logs/{name.split(".")[-1]}.log',
-        maxBytes=5*1024*1024, 
-        backupCount=5
     )
+
+def setup_logging():
+    """
+    Route every log record through a bounded queue to a background thread
+    that formats and writes it, so logging never does I/O on the event loop.
+
+    Returns:
+        The queue handler installed on the root logger
+    """
+    global _listener, _handler
+    if _handler is not None:
+        return _handler
+
+    formatter = _build_formatter()
+    file_handler = ModuleFileHandler()
     file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
     console_handler = logging.StreamHandler()
     console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
-    
+
+    _handler = DroppingQueueHandler(queue.Queue(maxsize=Config.LOG_QUEUE_SIZE))
+    _handler.addFilter(SamplingFilter(Config.LOG_SAMPLE_RATES))
+    root = logging.getLogger()
+    root.setLevel(Config.LOG_LEVEL)
+    root.addHandler(_handler)
+
+    _listener = QueueListener(_handler.queue, file_handler, console_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+    return _handler
+
+def shutdown_logging():
+    """Flush queued records and stop the background writer."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+def setup_logger(name, level=logging.INFO):
+    """Get a logger whose records go through the background logging pipeline."""
+    setup_logging()
+    logger = logging.getLogger(name)
+    logger.setLevel(level)
     return logger
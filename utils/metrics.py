@@ -0,0 +1,209 @@
+import math
+import time
+import logging
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self):
+        for key, value in self._values.items():
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+class Counter(_Metric):
+    """A value that only goes up."""
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+class Gauge(_Metric):
+    """A value that can go up and down, or be read from a function at scrape time."""
+    kind = "gauge"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._function = None
+
+    def set(self, value, **labels):
+        self._values[self._key(labels)] = value
+
+    def set_function(self, function):
+        """
+        Read the gauge from a function when scraped.
+
+        Args:
+            function: Returns a number, or a dict mapping label value tuples to numbers
+        """
+        self._function = function
+
+    def _samples(self):
+        if self._function is not None:
+            try:
+                result = self._function()
+            except Exception as e:
+                logger.error(f"Error collecting metric {self.name}: {e}")
+                return
+            values = result if isinstance(result, dict) else {(): result}
+            for key, value in values.items():
+                yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            return
+        yield from super()._samples()
+
+class Histogram(_Metric):
+    """Counts observations into cumulative buckets."""
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        state = self._values.get(key)
+        if state is None:
+            state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                state[0][i] += 1
+                break
+        state[1] += value
+        state[2] += 1
+
+    def _samples(self):
+        for key, (counts, total, count) in self._values.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, f'le="{_format_value(float(bound))}"')
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_format_value(total)}"
+            yield f"{self.name}_count{labels} {count}"
+
+class Registry:
+    """A set of metrics rendered together in Prometheus text format."""
+
+    def __init__(self):
+        self.metrics = {}
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self):
+        lines = []
+        for metric in self.metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+registry = Registry()
+
+COMMAND_LATENCY = registry.histogram(
+    "musicbot_command_latency_seconds", "Time taken to run a command.", ("command",)
+)
+COMMAND_ERRORS = registry.counter(
+    "musicbot_command_errors_total", "Command errors by exception type.", ("type",)
+)
+TRACK_TRANSITION_LATENCY = registry.histogram(
+    "musicbot_track_transition_seconds", "Time from a track ending to the next play request."
+)
+LOOKAHEAD_TRACKS = registry.counter(
+    "musicbot_lookahead_tracks_total", "Tracks started, by whether the lookahead had prepared them.", ("result",)
+)
+LAVALINK_REST_LATENCY = registry.histogram(
+    "musicbot_lavalink_rest_latency_seconds", "Lavalink REST request latency.", ("node",)
+)
+IDLE_DISCONNECTS = registry.counter(
+    "musicbot_idle_disconnects_total", "Players disconnected for being idle, by policy.", ("reason",)
+)
+SNAPSHOT_WRITE_LATENCY = registry.histogram(
+    "musicbot_snapshot_write_seconds", "Time taken to serialize and fsync a player snapshot batch."
+)
+SNAPSHOT_BYTES = registry.counter(
+    "musicbot_snapshot_bytes_total", "Bytes written to the player snapshot journal."
+)
+PLAYERS = registry.gauge("musicbot_players", "Active players.")
+QUEUE_DEPTH = registry.gauge("musicbot_queue_depth", "Tracks queued across all players.")
+CACHE_HITS = registry.gauge("musicbot_cache_hits", "Cache hits.", ("cache",))
+CACHE_MISSES = registry.gauge("musicbot_cache_misses", "Cache misses.", ("cache",))
+
+def observe_command(ctx):
+    """Record how long a command took, if it was timed by MusicBot.on_command."""
+    started = getattr(ctx, "started_at", None)
+    if started is not None and ctx.command is not None:
+        COMMAND_LATENCY.observe(time.perf_counter() - started, command=ctx.command.qualified_name)
+        ctx.started_at = None
+
+class MetricsServer:
+    """Serves the registry at /metrics over the bot's aiohttp stack."""
+
+    def __init__(self, host, port, metrics=registry):
+        self.host = host
+        self.port = port
+        self.registry = metrics
+        self._runner = None
+
+    async def _handle(self, request):
+        return web.Response(text=self.registry.render(), content_type="text/plain", charset="utf-8")
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get("/metrics", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        logger.info(f"Serving metrics on http://{self.host}:{self.port}/metrics")
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
@@ -0,0 +1,74 @@
+import discord
+
+from utils.embeds import queue_embed
+
+class QueueView(discord.ui.View):
+    """
+    Button-driven queue browser that only renders the page being shown.
+    """
+    def __init__(self, player, author, *, items_per_page=10, timeout=120):
+        super().__init__(timeout=timeout)
+        self.player = player
+        self.author = author
+        self.items_per_page = items_per_page
+        self.page = 1
+        self.message = None
+        self._pages = {}
+        self._state = None
+
+    @property
+    def total_pages(self):
+        """The number of pages in the queue right now."""
+        return max(1, (len(self.player.queue) + self.items_per_page - 1) // self.items_per_page)
+
+    def render(self):
+        """
+        Build the embed for the current page, reusing it if the queue hasn't changed.
+
+        Returns:
+            The page embed
+        """
+        state = (self.player.queue.version, self.player.current)
+        if state != self._state:
+            self._pages.clear()
+            self._state = state
+
+        self.page = max(1, min(self.page, self.total_pages))
+        embed = self._pages.get(self.page)
+        if embed is None:
+            embed = queue_embed(self.player, self.player.current, self.page, self.items_per_page)
+            self._pages[self.page] = embed
+
+        self.previous.disabled = self.page <= 1
+        self.next.disabled = self.page >= self.total_pages
+        return embed
+
+    async def interaction_check(self, interaction):
+        if interaction.user.id != self.author.id:
+            await interaction.response.send_message("Only the person who opened this queue can browse it.", ephemeral=True)
+            return False
+        return True
+
+    async def _show(self, interaction):
+        await interaction.response.edit_message(embed=self.render(), view=self)
+
+    @discord.ui.button(label="Previous", style=discord.ButtonStyle.secondary)
+    async def previous(self, interaction, button):
+        self.page -= 1
+        await self._show(interaction)
+
+    @discord.ui.button(label="Next", style=discord.ButtonStyle.secondary)
+    async def next(self, interaction, button):
+        self.page += 1
+        await self._show(interaction)
+
+    async def on_timeout(self):
+        self._pages.clear()
+        if self.message is None:
+            return
+        for item in self.children:
+            item.disabled = True
+        try:
+            await self.message.edit(view=self)
+        except discord.HTTPException:
+            pass
@@ -0,0 +1,168 @@
+import os
+import sys
+import time
+import asyncio
+import logging
+import threading
+import traceback
+from collections import Counter
+
+from config import Config
+from utils.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LOOP_LAG = registry.histogram(
+    "musicbot_event_loop_lag_seconds", "How late the event loop heartbeat ran.",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5)
+)
+
+def _owner(stack):
+    """
+    Find the bot code responsible for a stack.
+
+    Args:
+        stack: A traceback.StackSummary, outermost frame first
+
+    Returns:
+        A label such as "command play (cogs/Music.py:112)", or None
+    """
+    for frame in reversed(stack):
+        if not frame.filename.startswith(ROOT) or frame.filename == __file__:
+            continue
+
+        path = os.path.relpath(frame.filename, ROOT)
+        if path.startswith("cogs"):
+            kind = "listener" if frame.name.startswith("on_") else "command"
+        else:
+            kind = "listener" if frame.name.startswith("on_") else "function"
+        return f"{kind} {frame.name} ({path}:{frame.lineno})"
+    return None
+
+class SamplingProfiler:
+    """
+    Periodically samples the event loop thread's stack and counts the
+    bot functions that show up most.
+    """
+    def __init__(self, interval=None):
+        self.interval = interval or Config.PROFILER_INTERVAL
+        self.enabled = False
+        self.samples = Counter()
+        self.total = 0
+        self.started = None
+
+    def start(self):
+        self.samples.clear()
+        self.total = 0
+        self.started = time.monotonic()
+        self.enabled = True
+
+    def stop(self):
+        self.enabled = False
+
+    def sample(self, frame):
+        stack = traceback.extract_stack(frame)
+        self.total += 1
+        self.samples[_owner(stack) or f"{stack[-1].name} ({os.path.basename(stack[-1].filename)})"] += 1
+
+    def top(self, count=10):
+        """Get the most sampled functions with their share of samples."""
+        return [(label, hits / self.total) for label, hits in self.samples.most_common(count)] if self.total else []
+
+class LoopWatchdog:
+    """
+    Measures event loop lag and reports what is blocking the loop.
+
+    A heartbeat task records how late each wake-up is. A separate thread
+    notices when the heartbeat stops arriving, captures the loop thread's
+    stack while it is still blocked, and attributes the stall to the
+    command, listener or function at the top of the bot's own frames.
+    """
+    def __init__(self, threshold=None, interval=None):
+        self.threshold = threshold or Config.LOOP_LAG_THRESHOLD
+        self.interval = interval or Config.LOOP_LAG_INTERVAL
+        self.profiler = SamplingProfiler()
+        self.lag = 0.0
+        self.max_lag = 0.0
+        self.offenders = {}
+        self._beat = time.monotonic()
+        self._stall = None
+        self._loop_thread = None
+        self._task = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    def start(self):
+        """Start the heartbeat and the watcher thread."""
+        if self._task is not None:
+            return
+        self._loop_thread = threading.get_ident()
+        self._beat = time.monotonic()
+        self._task = asyncio.create_task(self._heartbeat())
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop monitoring."""
+        self._stop.set()
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    async def _heartbeat(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._beat = now
+            self.lag = max(0.0, now - expected)
+            self.max_lag = max(self.max_lag, self.lag)
+            LOOP_LAG.observe(self.lag)
+
+            stall, self._stall = self._stall, None
+            if stall is not None:
+                self._record(stall, self.lag)
+
+    def _record(self, stall, duration):
+        label, stack = stall
+        entry = self.offenders.setdefault(label, {"count": 0, "total": 0.0, "max": 0.0, "stack": None})
+        entry["count"] += 1
+        entry["total"] += duration
+        entry["max"] = max(entry["max"], duration)
+        entry["stack"] = stack
+        logger.warning(f"Event loop blocked for {duration * 1000:.0f}ms by {label}", extra={"event": "loop_stall"})
+
+    def _watch(self):
+        while not self._stop.is_set():
+            wait = self.profiler.interval if self.profiler.enabled else self.interval / 4
+            if self._stop.wait(wait):
+                return
+
+            frame = None
+            if self.profiler.enabled:
+                frame = sys._current_frames().get(self._loop_thread)
+                if frame is not None:
+                    self.profiler.sample(frame)
+
+            overdue = time.monotonic() - self._beat - self.interval
+            if overdue > self.threshold and self._stall is None:
+                frame = frame or sys._current_frames().get(self._loop_thread)
+                if frame is None:
+                    continue
+                stack = traceback.extract_stack(frame)
+                label = _owner(stack) or "unknown"
+                self._stall = (label, "".join(stack.format()[-15:]))
+            del frame
+
+    def top(self, count=10):
+        """Get the labels that blocked the loop for longest in total."""
+        ranked = sorted(self.offenders.items(), key=lambda item: item[1]["total"], reverse=True)
+        return ranked[:count]
+
+    def reset(self):
+        """Forget recorded offenders."""
+        self.offenders.clear()
+        self.max_lag = 0.0